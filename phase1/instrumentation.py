@@ -0,0 +1,157 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Profiling hooks that can be run around each measured pass.
+PROFILE_MODES = (None, "cprofile", "tracemalloc")
+
+
+class PassStats:
+    """Timers and counters of the passes of an algorithm, filled by the functions that accept a
+    stats argument. Functions given no stats skip every measurement, so instrumentation only has a
+    cost when it is asked for.
+
+    Each pass has its total time and number of runs, and counters are named after the pass they
+    belong to, such as "remove_in_between_points.removed". Passes can also be run under cProfile,
+    which gathers the calls made by all passes, or under tracemalloc, which records the peak memory
+    allocated by each pass. If tracemalloc was already tracing, its peak is kept for whoever started
+    it, so the peak of a pass is only known when it goes above the previous peak, and otherwise the
+    memory the pass still holds at its end is recorded instead.
+    """
+
+    def __init__(self, callback=None, profile=None):
+        """Creates empty stats.
+
+        Args:
+            callback (function): called after each pass with its name, its time in seconds and the
+            stats, such as to log the passes that were too slow, or None.
+            profile (string): None, "cprofile" or "tracemalloc".
+        """
+        if profile not in PROFILE_MODES:
+            raise ValueError(f"Profile mode must be one of {PROFILE_MODES}.")
+        self.callback = callback
+        self.profile = profile
+        self.timers = {}
+        self.runs = {}
+        self.counters = {}
+        self.memory_peaks = {}
+        self.profiler = cProfile.Profile() if profile == "cprofile" else None
+        # Number of passes being measured, as profiling hooks only run around the outermost one.
+        self._active = 0
+
+    def add(self, name, value=1):
+        """Adds a value to a counter."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def update_max(self, name, value):
+        """Keeps the largest value given to a counter."""
+        self.counters[name] = max(self.counters.get(name, value), value)
+
+    @contextmanager
+    def measure(self, name):
+        """Context manager that measures a run of a pass.
+
+        Args:
+            name (string): name of the pass.
+        """
+        hooked = self._active == 0 and self.profile is not None
+        tracing = False
+        if hooked and self.profile == "tracemalloc":
+            tracing = not tracemalloc.is_tracing()
+            if tracing:
+                tracemalloc.start()
+            baseline, previous_peak = tracemalloc.get_traced_memory()
+        elif hooked:
+            self.profiler.enable()
+        self._active += 1
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            self._active -= 1
+            if hooked and self.profile == "tracemalloc":
+                current, peak = tracemalloc.get_traced_memory()
+                if tracing:
+                    tracemalloc.stop()
+                elif peak == previous_peak:
+                    peak = current
+                self.memory_peaks[name] = max(self.memory_peaks.get(name, 0), peak - baseline)
+            elif hooked:
+                self.profiler.disable()
+            self.timers[name] = self.timers.get(name, 0.0) + elapsed
+            self.runs[name] = self.runs.get(name, 0) + 1
+        if self.callback is not None:
+            self.callback(name, elapsed, self)
+
+    def as_dict(self):
+        """Gives the timers, runs, counters and memory peaks, such as to be saved as JSON."""
+        return {
+            "timers": dict(self.timers),
+            "runs": dict(self.runs),
+            "counters": dict(self.counters),
+            "memory_peaks": dict(self.memory_peaks),
+        }
+
+    def format(self):
+        """Gives the stats as text, one pass or counter per line."""
+        lines = []
+        for name, elapsed in self.timers.items():
+            line = f"{name}: {self.runs[name]} runs, {elapsed * 1000:.3f} ms"
+            if name in self.memory_peaks:
+                line += f", {self.memory_peaks[name] / 1024:.1f} KiB peak"
+            lines.append(line)
+        for name, value in self.counters.items():
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+    def format_profile(self, sort="cumulative", limit=20):
+        """Gives the functions that took the most time in the profiled passes.
+
+        Args:
+            sort (string): column the functions are sorted by, as in pstats.
+            limit (integer): number of functions given.
+        Returns:
+            string: the profile as printed by pstats, or an empty string if cProfile was not used.
+        """
+        if self.profiler is None:
+            return ""
+        output = io.StringIO()
+        pstats.Stats(self.profiler, stream=output).sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+def log_slow_passes(threshold, log=print):
+    """Builds a callback for PassStats that reports the passes that took longer than a threshold,
+    along with the counters at that moment, to spot pathological inputs.
+
+    Args:
+        threshold (number): time in seconds above which a pass is reported.
+        log (function): function given each report, such as logging.warning.
+    Returns:
+        function: the callback.
+    """
+
+    def callback(name, elapsed, stats):
+        if elapsed > threshold:
+            log(f"Slow pass {name}: {elapsed * 1000:.3f} ms, counters {stats.counters}")
+
+    return callback
+
+
+if __name__ == "__main__":
+    # Test scenario: the passes of both questions, with each profiling mode.
+    from q1 import clean_polygon
+    from q2_b4 import fix_multiple_syntax_errors
+
+    polygon = [(0, 0), (0, 1), (0, 0), (0, 0), (0, 1), (1, 1), (2, 1), (1, 0), (0, 0)]
+    for profile in PROFILE_MODES:
+        stats = PassStats(callback=log_slow_passes(0.01), profile=profile)
+        clean_polygon(polygon, stats=stats)
+        fix_multiple_syntax_errors("({a" * 3, stats=stats)
+        print(f"Profile mode {profile}:")
+        print(stats.format())
+        print(stats.format_profile(limit=5))
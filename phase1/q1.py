@@ -1,4 +1,7 @@
-import math
+from collections.abc import Sequence
+
+from q1_polygon import Polygon
+from q1_predicates import is_point_between
 
 # Definition of the polygon to be analyzed
 points = [
@@ -14,6 +17,20 @@ points = [
 ]
 
 
+class InvalidPolygonError(ValueError):
+    """Error raised when a polygon does not follow the rules for defining a Polygon."""
+
+    def __init__(self, message, points=None):
+        """Creates the error.
+
+        Args:
+            message (string): description of the error.
+            points (A list of 2D coordinates): the invalid points, if available.
+        """
+        super().__init__(message)
+        self.points = points
+
+
 def is_polygon_valid(polygon_points):
     """Evaluates if the list of points follows the rules for defining a Polygon.
     - First and last point are the same.
@@ -26,30 +43,17 @@ def is_polygon_valid(polygon_points):
     return polygon_points[0] == polygon_points[len(polygon_points) - 1]
 
 
-def is_point_between(point_a, between_point, point_b):
-    """Evaluates if a point is contained in the same line segment defined by point a and point b.
-
-    Args:
-        point_a (2D coordinate): Given point a
-        between_point (2D coordinate): point to be analyzed if it is between point a and point b
-        point_b (2D coordinate): Given point b
-    Returns:
-        boolean: whether the point is in the same line segment defined by point a and point b
-    """
-    test_distance = math.dist(point_a, between_point) + math.dist(
-        between_point, point_b
-    )
-    return math.dist(point_a, point_b) == test_distance
-
-
 def remove_consecutive_repeated_points(points):
     """Removes consecutively repeated points, which add no new information to the polygon.
 
     Args:
-        points (A list of 2D coordinates): points of the polygon.
+        points (A list of 2D coordinates or a Polygon): points of the polygon.
     Returns:
-        clean_points (A list of 2D coordinates): points of the polygon without redundant points.
+        clean_points (A list of 2D coordinates or a Polygon): points of the polygon without
+        redundant points, in the same type given.
     """
+    if isinstance(points, Polygon):
+        return points.remove_consecutive_repeated_points()
     # Creates a copy of the list to not alter original list.
     aux_points = points.copy()
     # Array that will be filled with valid points.
@@ -63,15 +67,20 @@ def remove_consecutive_repeated_points(points):
     return clean_points
 
 
-def remove_in_between_points(points):
+def remove_in_between_points(points, tolerance=None):
     """Removes points that do not define line segments from a list of points that define a polygon.
     In other words, points that are "in between" two other points.
 
     Args:
-        points (A list of 2D coordinates): points of the polygon.
+        points (A list of 2D coordinates or a Polygon): points of the polygon.
+        tolerance (number): maximum distance from a removed point to its segment, or None for
+        exact tests.
     Returns:
-        clean_points (A list of 2D coordinates): points of the polygon without redundant points.
+        clean_points (A list of 2D coordinates or a Polygon): points of the polygon without
+        redundant points, in the same type given.
     """
+    if isinstance(points, Polygon):
+        return points.remove_in_between_points(tolerance)
     # Creates a copy of the list to not alter original list.
     aux_points = points.copy()
     # This elongates the array in a circular manner. Adds second last point to the beginning of the list,
@@ -84,7 +93,9 @@ def remove_in_between_points(points):
     for i in range(1, len(aux_points) - 1):
         # If the point is not contained in a line segment between the previous and
         # next point, add it to the list of valid points.
-        if not is_point_between(aux_points[i - 1], aux_points[i], aux_points[i + 1]):
+        if not is_point_between(
+            aux_points[i - 1], aux_points[i], aux_points[i + 1], tolerance
+        ):
             clean_points.append(aux_points[i])
 
     # If the start point is a redundant point, it was removed. Adding the new starting point at
@@ -100,10 +111,14 @@ def remove_repeated_chains(points):
     within a given polygon.
 
     Args:
-        points (A list of 2D coordinates): points of the polygon.
+        points (A list of 2D coordinates or a Polygon): points of the polygon.
     Returns:
-        clean_points (A list of 2D coordinates): points of the polygon without redundant points.
+        clean_points (A list of 2D coordinates or a Polygon): points of the polygon without
+        redundant points, in the same type given.
     """
+    # Polygons are analyzed with the hashed version, which gives the same result.
+    if isinstance(points, Polygon):
+        return Polygon.from_points(iter_remove_repeated_chains(points), points.typecode)
     # Creates a copy of the list to not alter original list.
     aux_points = points.copy()
     # Array that will be filled with valid points.
@@ -133,32 +148,288 @@ def remove_repeated_chains(points):
     return clean_points
 
 
-def clean_polygon(points):
-    """Removes redundant points from a list of points that define a polygon.
+# Key that marks, in the index of unique chains, that the points leading to a node form a chain.
+CHAIN_END = None
+
+
+def remove_repeated_chains_hashed(points):
+    """Removes repeated chains of points, which could be considered repetitions of a sub-polygon
+    within a given polygon. Gives the same result as remove_repeated_chains, but instead of
+    scanning lists, the points of the current chain are kept in a set and the unique chains
+    are indexed by a tree of dictionaries keyed by point, so each point is analyzed in
+    constant expected time.
 
     Args:
         points (A list of 2D coordinates): points of the polygon.
     Returns:
         clean_points (A list of 2D coordinates): points of the polygon without redundant points.
     """
+    return list(iter_remove_repeated_chains(points))
+
+
+def iter_remove_repeated_chains(points):
+    """Generator version of remove_repeated_chains_hashed. Points are consumed one at a time and
+    each chain is yielded as soon as it is known to be unique, so only the current chain and the
+    index of unique chains are kept in memory.
+
+    Args:
+        points (An iterable of 2D coordinates): points of the polygon.
+    Yields:
+        2D coordinate: points of the polygon without redundant points.
+    """
+    # Index of unique sub-polygons. Each chain is a path of point keys from the root, ending in
+    # a node that contains the CHAIN_END key.
+    unique_chains = {}
+    current_chain = []
+    current_chain_points = set()
+    # Node of the index reached by following the current chain. It is None once the current chain
+    # stops being the start of a unique chain, since appending points cannot make it one again.
+    current_node = unique_chains
+
+    for current_point in points:
+        # If the current point is in the current chain, then the chain is closed and a sub-polygon
+        # has been formed.
+        if current_point in current_chain_points:
+            # If the chain is unique, then it must be added to the index and to the valid points.
+            if current_node is None or CHAIN_END not in current_node:
+                node = unique_chains
+                for point in current_chain:
+                    node = node.setdefault(point, {})
+                node[CHAIN_END] = True
+                yield from current_chain
+            current_chain = []
+            current_chain_points = set()
+            current_node = unique_chains
+        current_chain.append(current_point)
+        current_chain_points.add(current_point)
+        if current_node is not None:
+            current_node = current_node.get(current_point)
+        # If the current chain is not unique, it must be discarded.
+        if current_node is not None and CHAIN_END in current_node:
+            current_chain = []
+            current_chain_points = set()
+            current_node = unique_chains
+
+    # If all points have been analyzed, the current unclosed chain must be added to the valid points.
+    yield from current_chain
+
+
+def get_closing_neighbour(points):
+    """Finds the point that comes before the closing point of a polygon, skipping consecutively
+    repeated points, by walking back from the end of the sequence.
+
+    Args:
+        points (A sequence of 2D coordinates): points of the polygon.
+    Returns:
+        2D coordinate: the last point different than the closing point, or None if there is none.
+    """
+    closing_point = points[len(points) - 1]
+    for i in reversed(range(len(points) - 1)):
+        if points[i] != closing_point:
+            return points[i]
+    return None
+
+
+def iter_remove_redundant_points(points, tolerance=None):
+    """Removes consecutively repeated points and points in between line segments in a single pass,
+    consuming the points one at a time and keeping only the last two distinct points in memory.
+    The result is the same as remove_in_between_points after remove_consecutive_repeated_points.
+
+    Whether the closing point is in between its neighbours depends on the second last point. For
+    sequences, it is looked up before the points are consumed. For other iterables it is only known
+    once all points are read, so the polygon is yielded starting at the first point kept after the
+    closing point, and a kept closing point is yielded last, right before the polygon is closed.
+
+    Args:
+        points (An iterable of 2D coordinates): points of the polygon.
+        tolerance (number): maximum distance from a removed point to its segment, or None for
+        exact tests.
+    Yields:
+        2D coordinate: points of the polygon without redundant points.
+    Raises:
+        InvalidPolygonError: if the first and last points are not the same, or if the polygon has a
+        single distinct point, as in clean_polygon_checked.
+    """
+    closing_neighbour = None
+    if isinstance(points, Sequence) and len(points) > 0:
+        closing_neighbour = get_closing_neighbour(points)
+    iterator = iter(points)
+    first_point = next(iterator, None)
+    if first_point is None:
+        raise InvalidPolygonError("Input Polygon is invalid.")
+    # The second distinct point, which is the next point of the closing point.
+    second_point = None
+    # Whether the closing point is kept, once it is known.
+    closing_kept = None
+    # Last two distinct points read. The middle point of a triple is decided once the next
+    # distinct point is read.
+    previous_point = None
+    current_point = first_point
+    first_kept = None
+    last_kept = None
+
+    for point in iterator:
+        # Consecutively repeated points add no new information to the polygon.
+        if point == current_point:
+            continue
+        if second_point is None:
+            second_point = point
+            # With the closing neighbour known in advance, the closing point can be yielded first.
+            if closing_neighbour is not None:
+                closing_kept = not is_point_between(
+                    closing_neighbour, first_point, second_point, tolerance
+                )
+                if closing_kept:
+                    yield first_point
+        # The current point is not the closing point, so both of its neighbours are known.
+        elif not is_point_between(previous_point, current_point, point, tolerance):
+            if first_kept is None:
+                first_kept = current_point
+            last_kept = current_point
+            yield current_point
+        previous_point = current_point
+        current_point = point
+
+    # After all points are read, the current point is the last point of the polygon.
+    if current_point != first_point:
+        raise InvalidPolygonError("Input Polygon is invalid.")
+    # A polygon with a single distinct point has no line segments to be analyzed.
+    if second_point is None:
+        raise InvalidPolygonError("Input Polygon is invalid.")
+    if closing_kept is None:
+        # The closing point is preceded by the second last point and followed by the second point.
+        if not is_point_between(previous_point, first_point, second_point, tolerance):
+            yield first_point
+            yield first_point if first_kept is None else first_kept
+            return
+    elif closing_kept:
+        yield first_point
+        return
+    # If the closing point is a redundant point, adding the first kept point at the end of the
+    # polygon will ensure it is closed.
+    if first_kept is not None and first_kept != last_kept:
+        yield first_kept
+
+
+def iter_clean_polygon(points, tolerance=None):
+    """Removes redundant points from the points that define a polygon, consuming the points one at
+    a time. Repeated chains are removed after the other redundant points, as in clean_polygon,
+    so the index of unique chains is the only structure that grows with the polygon.
+
+    For sequences, the result is the same as clean_polygon. For other iterables, such as points
+    read from a file, whether the first point is kept is only known at the end, so the removal of
+    repeated chains is given the points starting at the first point kept after it. That removal
+    depends on where the polygon starts, so the result can be a different polygon than the one of
+    clean_polygon, not only a rotation of it. Sequences should be given when the exact result of
+    clean_polygon is needed.
+
+    Args:
+        points (An iterable of 2D coordinates): points of the polygon.
+        tolerance (number): maximum distance from a point in between a line segment to the segment,
+        or None for exact tests.
+    Yields:
+        2D coordinate: points of the polygon without redundant points.
+    Raises:
+        InvalidPolygonError: if the input or the output polygon is invalid according to format.
+    """
+    first_point = None
+    last_point = None
+    for point in iter_remove_repeated_chains(
+        iter_remove_redundant_points(points, tolerance)
+    ):
+        if first_point is None:
+            first_point = point
+        last_point = point
+        yield point
+    # Tests if the newly generated polygon is valid according to format.
+    if first_point is None or first_point != last_point:
+        raise InvalidPolygonError("Output Polygon is invalid.")
+
+
+def run_measured_pass(stats, cleaning_pass, points, *args):
+    """Runs a pass of clean_polygon, recording its time and the number of points it removed.
+
+    Args:
+        stats (PassStats): stats where the pass is recorded.
+        cleaning_pass (function): the pass, which takes the points and returns the kept points.
+        points (A list of 2D coordinates or a Polygon): points of the polygon.
+        args: other arguments of the pass.
+    Returns:
+        clean_points (A list of 2D coordinates or a Polygon): points kept by the pass.
+    """
+    name = cleaning_pass.__name__
+    with stats.measure(name):
+        clean_points = cleaning_pass(points, *args)
+    stats.add(f"{name}.removed", len(points) - len(clean_points))
+    return clean_points
+
+
+def clean_polygon_checked(points, tolerance=None, stats=None):
+    """Removes redundant points from a list of points that define a polygon, raising an error
+    instead of printing it when the input or output polygon is invalid.
+
+    Args:
+        points (A list of 2D coordinates or a Polygon): points of the polygon.
+        tolerance (number): maximum distance from a point in between a line segment to the segment,
+        or None for exact tests.
+        stats (PassStats): if given, the time of each pass and the number of points it removed are
+        recorded in it.
+    Returns:
+        clean_points (A list of 2D coordinates or a Polygon): points of the polygon without
+        redundant points, in the same type given.
+    Raises:
+        InvalidPolygonError: if the input or the output polygon is invalid according to format.
+    """
     # If the input polygon is invalid according to format, cease analysis.
-    if not is_polygon_valid(points):
-        print("Input Polygon is invalid.")
-        return []
+    if len(points) == 0 or not is_polygon_valid(points):
+        raise InvalidPolygonError("Input Polygon is invalid.", points)
 
     # Now, apply all the functions for removing redundant points.
-    aux_points = remove_consecutive_repeated_points(points)
-    aux_points = remove_in_between_points(aux_points)
-    aux_points = remove_repeated_chains(aux_points)
+    if stats is None:
+        aux_points = remove_consecutive_repeated_points(points)
+    else:
+        stats.add("clean_polygon.points", len(points))
+        aux_points = run_measured_pass(stats, remove_consecutive_repeated_points, points)
+    # A polygon made of a single repeated point has no segments to be analyzed.
+    if len(aux_points) < 3:
+        raise InvalidPolygonError("Input Polygon is invalid.", points)
+    if stats is None:
+        aux_points = remove_in_between_points(aux_points, tolerance)
+        aux_points = remove_repeated_chains(aux_points)
+    else:
+        aux_points = run_measured_pass(stats, remove_in_between_points, aux_points, tolerance)
+        aux_points = run_measured_pass(stats, remove_repeated_chains, aux_points)
 
     # Tests if the newly generated polygon is valid according to format.
-    if not is_polygon_valid(aux_points):
-        print(aux_points)
-        print("Output Polygon is invalid.")
-        return []
+    if len(aux_points) == 0 or not is_polygon_valid(aux_points):
+        raise InvalidPolygonError("Output Polygon is invalid.", aux_points)
     return aux_points
 
 
-# Test scenario.
-print("Before list reduction: ", points)
-print("After list reduction: ", clean_polygon(points))
+def clean_polygon(points, tolerance=None, stats=None):
+    """Removes redundant points from a list of points that define a polygon.
+
+    Args:
+        points (A list of 2D coordinates or a Polygon): points of the polygon.
+        tolerance (number): maximum distance from a point in between a line segment to the segment,
+        or None for exact tests.
+        stats (PassStats): if given, the time of each pass and the number of points it removed are
+        recorded in it.
+    Returns:
+        clean_points (A list of 2D coordinates or a Polygon): points of the polygon without
+        redundant points, in the same type given.
+    """
+    try:
+        return clean_polygon_checked(points, tolerance, stats)
+    except InvalidPolygonError as error:
+        # The invalid output polygon is shown to help finding what went wrong.
+        if error.points is not points:
+            print(error.points)
+        print(error)
+        return []
+
+
+if __name__ == "__main__":
+    # Test scenario.
+    print("Before list reduction: ", points)
+    print("After list reduction: ", clean_polygon(points))
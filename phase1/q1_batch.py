@@ -0,0 +1,237 @@
+import numpy as np
+
+# Definition of the polygons to be analyzed, packed as a single coordinate buffer plus the
+# offsets where each polygon starts. Polygon i is coordinates[offsets[i]:offsets[i + 1]].
+coordinates = np.array(
+    [
+        (0, 0),
+        (0, 1),
+        (0, 0),
+        (0, 0),
+        (0, 1),
+        (1, 1),
+        (2, 1),
+        (1, 0),
+        (0, 0),
+        (1, 1),
+        (1, 2),
+        (1, 3),
+        (2, 3),
+        (2, 4),
+        (3, 4),
+        (3, 3),
+        (3, 2),
+        (2, 2),
+        (2, 1),
+        (1, 1),
+    ]
+)
+offsets = np.array([0, 9, 20])
+
+# Integer coordinates below this size have differences below 2^31, so the cross and dot products of
+# are_points_between, each a sum of two products of differences, are below 2^63 and are computed
+# exactly in 64 bit integers. Larger integers are analyzed as Python integers instead.
+MAX_EXACT_COORDINATE = 1 << 30
+
+
+def as_polygon_buffers(coordinates, offsets):
+    """Converts a coordinate buffer and its offsets to the array layout used by the batch functions.
+
+    Args:
+        coordinates (array-like): either an (N, 2) array of points or a flat array of 2N values.
+        offsets (array-like): P + 1 increasing indexes of where each polygon starts, ending at N.
+    Returns:
+        coordinates (ndarray): (N, 2) array of points. Integer coordinates that are too large for
+        exact products in 64 bits are given as Python integers, in an array of objects.
+        offsets (ndarray): int64 array of P + 1 offsets.
+    """
+    coordinates = np.asarray(coordinates).reshape(-1, 2)
+    if coordinates.dtype.kind in "iu" and coordinates.size:
+        if coordinates.min() <= -MAX_EXACT_COORDINATE or coordinates.max() >= MAX_EXACT_COORDINATE:
+            coordinates = coordinates.astype(object)
+        elif coordinates.dtype.kind == "u":
+            # Differences of unsigned integers would wrap around below zero.
+            coordinates = coordinates.astype(np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if offsets.ndim != 1 or len(offsets) == 0 or offsets[0] != 0:
+        raise ValueError("Offsets must be a one dimensional array starting at 0.")
+    if offsets[-1] != len(coordinates) or np.any(np.diff(offsets) < 0):
+        raise ValueError("Offsets must be increasing and end at the number of points.")
+    return coordinates, offsets
+
+
+def polygon_ids(offsets):
+    """Gives, for every point of the buffer, the index of the polygon it belongs to.
+
+    Args:
+        offsets (ndarray): P + 1 offsets of the polygons.
+    Returns:
+        ndarray: array of N polygon indexes.
+    """
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def are_polygons_valid(coordinates, offsets):
+    """Evaluates, for every polygon of the buffer, if it follows the rules for defining a Polygon.
+    - First and last point are the same.
+
+    Args:
+        coordinates (ndarray): (N, 2) array of points.
+        offsets (ndarray): P + 1 offsets of the polygons.
+    Returns:
+        ndarray: boolean array of P elements, whether each polygon follows the rules defined.
+    """
+    sizes = np.diff(offsets)
+    valid = sizes > 0
+    # Empty polygons are invalid, so only the non empty ones have their ends compared.
+    first = offsets[:-1][valid]
+    last = offsets[1:][valid] - 1
+    valid[valid] = np.all(coordinates[first] == coordinates[last], axis=1)
+    return valid
+
+
+def compact_polygons(coordinates, offsets, keep):
+    """Keeps only the selected points of the buffer, updating the offsets accordingly.
+
+    Args:
+        coordinates (ndarray): (N, 2) array of points.
+        offsets (ndarray): P + 1 offsets of the polygons.
+        keep (ndarray): boolean array of N elements, whether each point is kept.
+    Returns:
+        coordinates (ndarray): (M, 2) array of the kept points.
+        offsets (ndarray): P + 1 offsets of the polygons after compaction.
+    """
+    # The number of kept points before each offset gives the new offset.
+    kept_before = np.concatenate(([0], np.cumsum(keep, dtype=np.int64)))
+    return coordinates[keep], kept_before[offsets]
+
+
+def remove_consecutive_repeated_points(coordinates, offsets):
+    """Removes consecutively repeated points of every polygon of the buffer, which add no new
+    information to the polygons.
+
+    Args:
+        coordinates (ndarray): (N, 2) array of points.
+        offsets (ndarray): P + 1 offsets of the polygons.
+    Returns:
+        coordinates (ndarray): (M, 2) array of points without redundant points.
+        offsets (ndarray): P + 1 offsets of the polygons after removal.
+    """
+    keep = np.ones(len(coordinates), dtype=bool)
+    # A point is kept if it is different than its consecutive point.
+    keep[:-1] = np.any(coordinates[:-1] != coordinates[1:], axis=1)
+    # The last point of each polygon has no consecutive point after it, so it is always kept.
+    sizes = np.diff(offsets)
+    keep[offsets[1:][sizes > 0] - 1] = True
+    return compact_polygons(coordinates, offsets, keep)
+
+
+def are_points_between(point_a, between_point, point_b):
+    """Evaluates, element by element, if a point is contained in the line segment defined by
+    point a and point b. The point is in the segment when it is collinear with both points
+    (null cross product) and does not go past either of them (non positive dot product).
+    Unlike comparing sums of distances, no square roots are taken, so integer coordinates give
+    exact answers, as long as the products fit in their type: int64 coordinates must be below
+    MAX_EXACT_COORDINATE in absolute value, which as_polygon_buffers ensures.
+
+    Args:
+        point_a (ndarray): (K, 2) array of points a.
+        between_point (ndarray): (K, 2) array of points to be analyzed.
+        point_b (ndarray): (K, 2) array of points b.
+    Returns:
+        ndarray: boolean array of K elements, whether each point is in its line segment.
+    """
+    to_a = point_a - between_point
+    to_b = point_b - between_point
+    cross = to_a[:, 0] * to_b[:, 1] - to_a[:, 1] * to_b[:, 0]
+    dot = to_a[:, 0] * to_b[:, 0] + to_a[:, 1] * to_b[:, 1]
+    return (cross == 0) & (dot <= 0)
+
+
+def remove_in_between_points(coordinates, offsets):
+    """Removes points that do not define line segments from every polygon of the buffer.
+    In other words, points that are "in between" two other points.
+
+    Args:
+        coordinates (ndarray): (N, 2) array of points.
+        offsets (ndarray): P + 1 offsets of the polygons.
+    Returns:
+        coordinates (ndarray): (M, 2) array of points without redundant points.
+        offsets (ndarray): P + 1 offsets of the polygons after removal.
+    """
+    starts = offsets[:-1]
+    sizes = np.diff(offsets)
+    ids = polygon_ids(offsets)
+    indexes = np.arange(len(coordinates))
+    # Neighbours are taken in a circular manner: the first point comes after the second last point,
+    # and the last point comes before the second point, just like the list based solution.
+    previous_indexes = indexes - 1
+    next_indexes = indexes + 1
+    first = starts[sizes > 0]
+    last = offsets[1:][sizes > 0] - 1
+    previous_indexes[first] = last - 1
+    next_indexes[last] = first + 1
+
+    # Polygons with less than three points have no segments to simplify, so all their points are kept.
+    keep = np.ones(len(coordinates), dtype=bool)
+    checked = sizes[ids] >= 3
+    keep[checked] = ~are_points_between(
+        coordinates[previous_indexes[checked]],
+        coordinates[checked],
+        coordinates[next_indexes[checked]],
+    )
+
+    # If the start point is a redundant point, it was removed along with the last point. The first
+    # remaining point must then be added at the end of the polygon, to ensure it is closed.
+    kept_before = np.concatenate(([0], np.cumsum(keep, dtype=np.int64)))
+    kept_sizes = kept_before[offsets[1:]] - kept_before[starts]
+    kept_indexes = indexes[keep]
+    if len(kept_indexes) == 0:
+        return coordinates[kept_indexes], np.zeros_like(offsets)
+    first_kept = kept_indexes[np.minimum(kept_before[starts], len(kept_indexes) - 1)]
+    last_kept = kept_indexes[np.maximum(kept_before[offsets[1:]] - 1, 0)]
+    append = (kept_sizes > 0) & np.any(
+        coordinates[first_kept] != coordinates[last_kept], axis=1
+    )
+
+    # Gathers the kept points, leaving one extra slot at the end of each polygon that is closed again.
+    new_offsets = np.concatenate(([0], np.cumsum(kept_sizes + append)))
+    gather = np.empty(new_offsets[-1], dtype=np.int64)
+    ranks = kept_before[:-1][keep] - kept_before[starts][ids[keep]]
+    gather[new_offsets[:-1][ids[keep]] + ranks] = kept_indexes
+    gather[new_offsets[1:][append] - 1] = first_kept[append]
+    return coordinates[gather], new_offsets
+
+
+def clean_polygons(coordinates, offsets):
+    """Removes consecutively repeated points and points in between line segments from every
+    polygon of a coordinate buffer, applying each step to all polygons at once.
+
+    Args:
+        coordinates (array-like): either an (N, 2) array of points or a flat array of 2N values.
+        offsets (array-like): P + 1 increasing indexes of where each polygon starts, ending at N.
+    Returns:
+        coordinates (ndarray): (M, 2) array of the points of the cleaned polygons.
+        offsets (ndarray): P + 1 offsets of the cleaned polygons. Invalid polygons are left empty.
+    """
+    coordinates, offsets = as_polygon_buffers(coordinates, offsets)
+    # Invalid polygons according to format are not analyzed, which leaves them empty.
+    valid = are_polygons_valid(coordinates, offsets)
+    keep = valid[polygon_ids(offsets)]
+    coordinates, offsets = compact_polygons(coordinates, offsets, keep)
+
+    # Now, apply all the functions for removing redundant points.
+    coordinates, offsets = remove_consecutive_repeated_points(coordinates, offsets)
+    coordinates, offsets = remove_in_between_points(coordinates, offsets)
+    return coordinates, offsets
+
+
+if __name__ == "__main__":
+    # Test scenario.
+    clean_coordinates, clean_offsets = clean_polygons(coordinates, offsets)
+    for i in range(len(offsets) - 1):
+        print("Before list reduction: ", coordinates[offsets[i] : offsets[i + 1]].tolist())
+        print(
+            "After list reduction: ",
+            clean_coordinates[clean_offsets[i] : clean_offsets[i + 1]].tolist(),
+        )
@@ -0,0 +1,244 @@
+"""Benchmarks of the polygon cleaning solutions of question 1.
+
+Each solution and each pass of the thorough solution is run on synthetic polygons of several
+shapes and sizes, measuring the time per vertex, the peak memory and the number of memory blocks
+allocated by the call that are still alive after it, mostly its result. Python has no count of
+every allocation made by a call, including freed ones, so the peak memory is the measure of the
+temporary allocations. Results are saved as JSON, and can be compared with the results of a previous run.
+
+Usage:
+    python q1_benchmark.py --sizes 10 100 1000 10000 --output results.json
+    python q1_benchmark.py --output new.json --compare results.json
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import q1
+import q1_simple
+
+# Sizes above this are not run with the passes whose time grows quadratically with the size.
+MAX_QUADRATIC_SIZE = 10_000
+
+
+def generate_collinear_runs(size, seed=0):
+    """A square whose sides are made of many collinear points."""
+    side = max(1, (size - 1) // 4)
+    points = [(i, 0) for i in range(side)]
+    points += [(side, i) for i in range(side)]
+    points += [(side - i, side) for i in range(side)]
+    points += [(0, side - i) for i in range(side)]
+    points.append(points[0])
+    return points
+
+
+def generate_duplicate_vertices(size, seed=0):
+    """A random polygon where every vertex is repeated a few times in a row."""
+    generator = random.Random(seed)
+    points = []
+    while len(points) < size - 1:
+        point = (generator.randint(0, 1000), generator.randint(0, 1000))
+        points += [point] * generator.randint(1, 4)
+    points = points[: max(1, size - 1)]
+    points.append(points[0])
+    return points
+
+
+def generate_repeated_sub_loops(size, seed=0):
+    """A polygon that goes around the same few sub-polygons many times."""
+    generator = random.Random(seed)
+    loops = [
+        [(generator.randint(0, 100), generator.randint(0, 100)) for _ in range(5)]
+        for _ in range(4)
+    ]
+    points = []
+    while len(points) < size - 1:
+        points += generator.choice(loops)
+    points = points[: max(1, size - 1)]
+    points.append(points[0])
+    return points
+
+
+def generate_random_convex(size, seed=0):
+    """A random convex polygon, with points on a circle."""
+    generator = random.Random(seed)
+    angles = sorted(generator.uniform(0, 2 * math.pi) for _ in range(max(1, size - 1)))
+    points = [(1000 * math.cos(angle), 1000 * math.sin(angle)) for angle in angles]
+    points.append(points[0])
+    return points
+
+
+def generate_random_concave(size, seed=0):
+    """A random star shaped polygon, with points at random distances from its center."""
+    generator = random.Random(seed)
+    count = max(1, size - 1)
+    points = []
+    for i in range(count):
+        angle = 2 * math.pi * i / count
+        radius = generator.uniform(100, 1000)
+        points.append((round(radius * math.cos(angle)), round(radius * math.sin(angle))))
+    points.append(points[0])
+    return points
+
+
+GENERATORS = {
+    "collinear_runs": generate_collinear_runs,
+    "duplicate_vertices": generate_duplicate_vertices,
+    "repeated_sub_loops": generate_repeated_sub_loops,
+    "random_convex": generate_random_convex,
+    "random_concave": generate_random_concave,
+}
+
+
+def get_cases(points):
+    """Gives the functions to be measured for a polygon. Each pass is given the output of the
+    passes before it, as in clean_polygon.
+
+    Args:
+        points (A list of 2D coordinates): points of the polygon.
+    Returns:
+        list of tuples: name of each case, function, its argument and whether it is quadratic.
+    """
+    no_repeated_points = q1.remove_consecutive_repeated_points(points)
+    no_in_between_points = q1.remove_in_between_points(no_repeated_points)
+    return [
+        ("q1.clean_polygon", q1.clean_polygon, points, True),
+        ("q1_simple.clean_polygon", q1_simple.clean_polygon, points, False),
+        (
+            "q1.remove_consecutive_repeated_points",
+            q1.remove_consecutive_repeated_points,
+            points,
+            False,
+        ),
+        ("q1.remove_in_between_points", q1.remove_in_between_points, no_repeated_points, False),
+        ("q1.remove_repeated_chains", q1.remove_repeated_chains, no_in_between_points, True),
+        (
+            "q1.remove_repeated_chains_hashed",
+            q1.remove_repeated_chains_hashed,
+            no_in_between_points,
+            False,
+        ),
+    ]
+
+
+def measure(function, argument, repeat):
+    """Measures a function call.
+
+    Args:
+        function (function): the function to be measured.
+        argument: the argument of the function.
+        repeat (integer): number of timed calls, of which the fastest is kept.
+    Returns:
+        dictionary: best time in seconds, peak memory in bytes and number of memory blocks
+        allocated by the call that were still alive after it (mostly its result).
+    """
+    best_time = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        best_time = min(best_time, time.perf_counter() - start)
+
+    # Memory is measured on a separate call, since tracing makes the calls slower.
+    tracemalloc.start()
+    result = function(argument)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    # Only blocks allocated since tracing started are traced, without the ones of tracemalloc.
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    )
+    tracemalloc.stop()
+    del result
+    return {
+        "seconds": best_time,
+        "peak_bytes": peak_memory,
+        "retained_blocks": sum(statistic.count for statistic in snapshot.statistics("filename")),
+    }
+
+
+def run_benchmarks(sizes, shapes, repeat, max_quadratic_size=MAX_QUADRATIC_SIZE):
+    """Runs every case for every shape and size.
+
+    Args:
+        sizes (list of integers): number of points of the polygons.
+        shapes (list of strings): names of the polygon generators.
+        repeat (integer): number of timed calls of each case.
+        max_quadratic_size (integer): sizes above this skip the quadratic cases.
+    Returns:
+        list of dictionaries: one result per case, shape and size.
+    """
+    results = []
+    for shape in shapes:
+        for size in sizes:
+            points = GENERATORS[shape](size)
+            for name, function, argument, quadratic in get_cases(points):
+                result = {"case": name, "shape": shape, "size": len(points)}
+                if quadratic and size > max_quadratic_size:
+                    result["skipped"] = True
+                else:
+                    result.update(measure(function, argument, repeat))
+                    result["seconds_per_vertex"] = result["seconds"] / len(points)
+                results.append(result)
+                print(format_result(result), file=sys.stderr)
+    return results
+
+
+def format_result(result, previous=None):
+    """Formats a result as a line of text, with the ratio to a previous result if given."""
+    line = f"{result['case']:<40} {result['shape']:<20} {result['size']:>8}"
+    if result.get("skipped"):
+        return line + "  skipped"
+    line += (
+        f"  {result['seconds_per_vertex'] * 1e9:>10.1f} ns/vertex"
+        f"  {result['peak_bytes']:>12} B peak  {result['retained_blocks']:>8} retained blocks"
+    )
+    if previous is not None and not previous.get("skipped"):
+        line += f"  x{result['seconds'] / previous['seconds']:.2f} time"
+    return line
+
+
+def compare_results(results, previous_results):
+    """Prints each result next to the result of the same case in a previous run."""
+    previous = {
+        (result["case"], result["shape"], result["size"]): result
+        for result in previous_results
+    }
+    for result in results:
+        key = (result["case"], result["shape"], result["size"])
+        print(format_result(result, previous.get(key)))
+
+
+def main(arguments=None):
+    """Command line interface of the benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmarks of polygon cleaning.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--shapes", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-quadratic-size", type=int, default=MAX_QUADRATIC_SIZE)
+    parser.add_argument("--output", help="path of the JSON file for the results")
+    parser.add_argument("--compare", help="path of the JSON file of a previous run")
+    arguments = parser.parse_args(arguments)
+
+    results = run_benchmarks(
+        arguments.sizes, arguments.shapes, arguments.repeat, arguments.max_quadratic_size
+    )
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            compare_results(results, json.load(file)["results"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+from bisect import bisect_left
+from collections import OrderedDict, namedtuple
+
+from q1 import clean_polygon, is_polygon_valid, remove_repeated_chains_hashed
+from q1_predicates import is_point_between
+
+# Statistics of a polygon cache, in the same format as functools.lru_cache.
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def get_least_rotation(ring):
+    """Finds the rotation of a sequence that is the smallest in lexicographic order, with Booth's
+    algorithm, in linear time.
+
+    Args:
+        ring (A list of comparable elements): the sequence, seen as a circle.
+    Returns:
+        integer: index where the smallest rotation starts.
+    """
+    size = len(ring)
+    # Failure function of the doubled sequence, as in the Knuth-Morris-Pratt algorithm.
+    failure = [-1] * (2 * size)
+    least = 0
+    for j in range(1, 2 * size):
+        element = ring[j % size]
+        i = failure[j - least - 1]
+        while i != -1 and element != ring[(least + i + 1) % size]:
+            if element < ring[(least + i + 1) % size]:
+                least = j - i - 1
+            i = failure[i]
+        if element != ring[(least + i + 1) % size]:
+            # i is -1 here.
+            if element < ring[least % size]:
+                least = j
+            failure[j - least] = -1
+        else:
+            failure[j - least] = i + 1
+    return least % size if size else 0
+
+
+def get_canonical_polygon(points):
+    """Rotates a polygon so it starts at the point where its smallest rotation starts. Rotations of
+    the same polygon have the same canonical polygon.
+
+    Args:
+        points (A list of 2D coordinates): points of the polygon, with the closing point.
+    Returns:
+        canonical (tuple of 2D coordinates): points of the rotated polygon, with the closing point.
+        start (integer): index of the polygon where the canonical polygon starts.
+    """
+    ring = [tuple(point) for point in points[: len(points) - 1]]
+    start = get_least_rotation(ring)
+    canonical = ring[start:] + ring[:start]
+    canonical.append(canonical[0])
+    return tuple(canonical), start
+
+
+def get_kept_indexes(points, tolerance=None):
+    """Finds the points of a polygon kept by the removal of consecutively repeated points and of
+    points in between line segments. Whether a point is kept only depends on its neighbours, so the
+    same points are kept in every rotation of the polygon, while the removal of repeated chains
+    depends on the point where the polygon starts.
+
+    Args:
+        points (A list of 2D coordinates): points of the polygon, with the closing point.
+        tolerance (number): maximum distance from a point in between a line segment to the segment,
+        or None for exact tests.
+    Returns:
+        list of integers: increasing indexes of the kept points, without the closing point, or
+        None if the polygon has less than two distinct points.
+    """
+    size = len(points) - 1
+    # The last point of each run of repeated points is kept, where the run at the end of the ring
+    # continues at its start.
+    run_ends = [index for index in range(size) if points[index] != points[(index + 1) % size]]
+    if len(run_ends) < 2:
+        return None
+    return [
+        run_ends[position]
+        for position in range(len(run_ends))
+        if not is_point_between(
+            points[run_ends[position - 1]],
+            points[run_ends[position]],
+            points[run_ends[(position + 1) % len(run_ends)]],
+            tolerance,
+        )
+    ]
+
+
+class PolygonCache:
+    """Memoization of clean_polygon for collections with repeated polygons. Polygons are keyed by
+    their canonical rotation, so a polygon and its rotations share a single entry, and the least
+    recently used entries are evicted when the cache is full.
+
+    Each entry keeps the points that survive the removal of repeated and in between points, which
+    are the same in every rotation. The removal of repeated chains depends on where the polygon
+    starts, so it is run again on the kept points in the rotation given, which only takes a
+    dictionary lookup per point.
+    """
+
+    def __init__(self, maxsize=1024, tolerance=None):
+        """Creates an empty cache.
+
+        Args:
+            maxsize (integer): maximum number of polygons kept.
+            tolerance (number): maximum distance from a point in between a line segment to the
+            segment, or None for exact tests.
+        """
+        self.maxsize = maxsize
+        self.tolerance = tolerance
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def clean(self, points):
+        """Removes redundant points from a list of points that define a polygon, using the
+        cached result when the polygon or one of its rotations was cleaned before.
+
+        Args:
+            points (A list of 2D coordinates or a Polygon): points of the polygon.
+        Returns:
+            clean_points (A list of 2D coordinates): points of the polygon without redundant points.
+        """
+        # Invalid polygons have no canonical rotation, so they are not cached.
+        if len(points) == 0 or not is_polygon_valid(points):
+            return clean_polygon(list(points), self.tolerance)
+
+        key, start = get_canonical_polygon(points)
+        kept_indexes = self.entries.get(key)
+        if kept_indexes is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        else:
+            self.misses += 1
+            kept_indexes = tuple(get_kept_indexes(key, self.tolerance) or ())
+            self.entries[key] = kept_indexes
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        # Polygons without line segments or without kept points give the errors of clean_polygon.
+        if not kept_indexes:
+            return clean_polygon(list(points), self.tolerance)
+
+        # The kept points start at the first one at or after the first point of the given polygon.
+        size = len(key) - 1
+        first = bisect_left(kept_indexes, (size - start) % size)
+        kept_points = [key[index] for index in kept_indexes[first:] + kept_indexes[:first]]
+        kept_points.append(kept_points[0])
+        clean_points = remove_repeated_chains_hashed(kept_points)
+        # Invalid clean polygons are cleaned again, to give the errors of clean_polygon.
+        if len(clean_points) == 0 or not is_polygon_valid(clean_points):
+            return clean_polygon(list(points), self.tolerance)
+        return clean_points
+
+    def cache_info(self):
+        """Gives the statistics of the cache.
+
+        Returns:
+            CacheInfo: number of hits and misses, maximum and current number of polygons kept.
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+    def cache_clear(self):
+        """Removes every polygon from the cache and resets its statistics."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+if __name__ == "__main__":
+    # Test scenario: the same square twice, once rotated, and then a different polygon.
+    cache = PolygonCache(maxsize=2)
+    print(cache.clean([(0, 0), (1, 0), (2, 0), (2, 2), (0, 2), (0, 0)]))
+    print(cache.clean([(2, 2), (0, 2), (0, 0), (1, 0), (2, 0), (2, 2)]))
+    print(cache.clean([(1, 1), (1, 2), (1, 3), (2, 3), (3, 3), (3, 1), (1, 1)]))
+    print(cache.cache_info())
+
+    # Test scenario: every rotation of polygons with repeated chains, whose clean polygon depends
+    # on the point where they start, gives the same as clean_polygon.
+    for polygon in [
+        [(2, 1), (0, 1), (2, 1), (0, 1), (2, 2), (2, 0), (2, 1)],
+        [(0, 0), (0, 1), (0, 0), (0, 0), (0, 1), (1, 1), (2, 1), (1, 0), (0, 0)],
+    ]:
+        ring = polygon[: len(polygon) - 1]
+        for start in range(len(ring)):
+            rotation = ring[start:] + ring[:start] + [ring[start]]
+            assert cache.clean(rotation) == clean_polygon(rotation), rotation
+    print("Rotations match clean_polygon:", cache.cache_info())
@@ -0,0 +1,389 @@
+from bisect import bisect_left
+
+from q1 import CHAIN_END, InvalidPolygonError, clean_polygon_checked, is_polygon_valid
+from q1_predicates import is_point_between
+
+# Polygons up to this number of points are analyzed again as a whole after every edit, since
+# they are too small for neighbourhoods of an edit to be told apart.
+SMALL_POLYGON_POINTS = 8
+# Number of points after which the state of the removal of repeated chains is saved again inside a
+# chain, so that an edit in a long chain does not analyze it again from its start.
+CHECKPOINT_INTERVAL = 32
+
+
+class IncrementalPolygonCleaner:
+    """Keeps the clean version of a polygon up to date while its vertices are edited one at a time.
+
+    Whether each point survives the removal of consecutively repeated points and of points in
+    between line segments only depends on its neighbours, so after an edit only the points around
+    it are analyzed again. The removal of repeated chains goes through the points in order, so its
+    state is saved whenever a chain starts and every CHECKPOINT_INTERVAL points inside a chain, and
+    after an edit the analysis resumes from the last state saved before the edited point.
+
+    Vertices are indexed as in the list of points of the polygon, without its closing point, which
+    always follows the first vertex.
+    """
+
+    def __init__(self, points, tolerance=None):
+        """Analyzes the whole polygon for the first time.
+
+        Args:
+            points (A list of 2D coordinates): points of the polygon, with the closing point.
+            tolerance (number): maximum distance from a point in between a line segment to the
+            segment, or None for exact tests.
+        Raises:
+            InvalidPolygonError: if the polygon is invalid according to format.
+        """
+        if len(points) == 0 or not is_polygon_valid(points):
+            raise InvalidPolygonError("Input Polygon is invalid.", points)
+        self.tolerance = tolerance
+        # Points of the polygon, with the closing point.
+        self._points = list(points)
+        # Whether each point survives the removal of repeated and in between points.
+        self._kept = bytearray(len(self._points))
+        self._update_kept(0, len(self._points) - 1)
+        # Index of unique chains, as in iter_remove_repeated_chains, and the log of what each
+        # insertion created, so that insertions can be undone.
+        self._chains = {}
+        self._chain_log = []
+        # Points of the clean polygon up to the start of the current chain.
+        self._clean_points = []
+        # Points of every chain analyzed, in order, and the positions of each point among them. The
+        # current chain is the end of the list from its start position, so saving its state only
+        # takes its size.
+        self._chain_points = []
+        self._chain_positions = {}
+        self._chain_start = 0
+        # Saved states of the removal of repeated chains, each the index of the next point analyzed,
+        # the number of clean points, the size of the log of chains, the number of chain points, the
+        # start of the current chain and the node of the current chain in the index of chains.
+        self._checkpoints = [(0, 0, 0, 0, 0, self._chains)]
+        self._checkpoint_starts = [0]
+
+    @property
+    def points(self):
+        """A list of 2D coordinates: points of the polygon, with the closing point."""
+        return list(self._points)
+
+    def __len__(self):
+        return len(self._points) - 1
+
+    def insert(self, index, point):
+        """Inserts a vertex before the vertex at the given index.
+
+        Args:
+            index (integer): index of the new vertex, from 0 to the number of vertices.
+            point (2D coordinate): the new vertex.
+        """
+        if not 0 <= index <= len(self):
+            raise IndexError("Vertex index out of range.")
+        self._points.insert(index, point)
+        self._kept.insert(index, 0)
+        changed = [index]
+        # A new first vertex is also the new closing point.
+        if index == 0:
+            self._points[len(self._points) - 1] = point
+            changed.append(len(self._points) - 1)
+        self._update_after_edit(changed)
+
+    def append(self, point):
+        """Adds a vertex after the last vertex, right before the closing point.
+
+        Args:
+            point (2D coordinate): the new vertex.
+        """
+        self.insert(len(self), point)
+
+    def delete(self, index):
+        """Deletes the vertex at the given index.
+
+        Args:
+            index (integer): index of the vertex, from 0 to the number of vertices minus one.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("Vertex index out of range.")
+        if len(self) == 1:
+            raise InvalidPolygonError("A polygon must have at least one vertex.")
+        del self._points[index]
+        del self._kept[index]
+        changed = [min(index, len(self._points) - 1)]
+        # Deleting the first vertex changes the closing point.
+        if index == 0:
+            self._points[len(self._points) - 1] = self._points[0]
+            changed.append(len(self._points) - 1)
+        self._update_after_edit(changed)
+
+    @property
+    def cleaned(self):
+        """A list of 2D coordinates: points of the polygon without redundant points, the same as
+        given by clean_polygon for the current points.
+
+        Raises:
+            InvalidPolygonError: if the clean polygon is invalid according to format.
+        """
+        # Small polygons, polygons without line segments and polygons without any kept point are
+        # analyzed as a whole.
+        if (
+            len(self._points) <= SMALL_POLYGON_POINTS
+            or self._has_single_point()
+            or 1 not in self._kept
+        ):
+            return clean_polygon_checked(self._points, self.tolerance)
+        clean_points = self._remove_repeated_chains()
+        if len(clean_points) == 0 or not is_polygon_valid(clean_points):
+            raise InvalidPolygonError("Output Polygon is invalid.", clean_points)
+        return clean_points
+
+    def _has_single_point(self):
+        """Evaluates if all points of the polygon are the same, which leaves no line segments."""
+        return self._get_run_end(0) == len(self._points) - 1
+
+    def _get_run_start(self, index):
+        """Gives the index of the first point of the run of repeated points that contains the index."""
+        points = self._points
+        while index > 0 and points[index - 1] == points[index]:
+            index -= 1
+        return index
+
+    def _get_run_end(self, index):
+        """Gives the index of the last point of the run of repeated points that contains the index."""
+        points = self._points
+        last_index = len(points) - 1
+        while index < last_index and points[index + 1] == points[index]:
+            index += 1
+        return index
+
+    def _is_kept(self, index):
+        """Evaluates if a point survives the removal of repeated and in between points.
+
+        Args:
+            index (integer): index of the point.
+        Returns:
+            boolean: whether the point is kept.
+        """
+        points = self._points
+        last_index = len(points) - 1
+        # Only the last point of each run of repeated points is kept.
+        if index != self._get_run_end(index):
+            return False
+        first_kept = self._get_run_end(0)
+        if first_kept == last_index:
+            return True
+        # The first and last distinct points are the closing point, which is preceded by the second
+        # last distinct point and followed by the second distinct point.
+        if index == first_kept or index == last_index:
+            previous_point = points[self._get_run_start(last_index) - 1]
+            next_point = points[first_kept + 1]
+        else:
+            previous_point = points[self._get_run_start(index) - 1]
+            next_point = points[index + 1]
+        return not is_point_between(
+            previous_point, points[index], next_point, self.tolerance
+        )
+
+    def _update_kept(self, start, stop):
+        """Analyzes again whether each point between two indexes is kept.
+
+        Args:
+            start (integer): index of the first point analyzed.
+            stop (integer): index of the last point analyzed.
+        Returns:
+            integer: index of the first point whose result changed, or None if none changed.
+        """
+        first_changed = None
+        for index in range(start, stop + 1):
+            kept = self._is_kept(index)
+            if kept != self._kept[index]:
+                self._kept[index] = kept
+                if first_changed is None:
+                    first_changed = index
+        return first_changed
+
+    def _update_after_edit(self, changed):
+        """Analyzes again the points around the edited points, and discards the saved states of the
+        removal of repeated chains that come after the first change.
+
+        Args:
+            changed (A list of integers): indexes of the points that were edited.
+        """
+        last_index = len(self._points) - 1
+        if len(self._points) <= SMALL_POLYGON_POINTS:
+            self._update_kept(0, last_index)
+            self._discard_checkpoints(0)
+            return
+
+        first_changed = min(changed)
+        # The closing point is analyzed with the second and second last distinct points, so the
+        # first and last kept points are analyzed again after every edit.
+        neighbourhoods = [index for index in changed]
+        neighbourhoods += [self._get_run_end(0), last_index]
+        for index in neighbourhoods:
+            # Two runs of repeated points before and after the point can change.
+            start = index
+            stop = index
+            for _ in range(3):
+                start = max(0, self._get_run_start(start) - 1)
+                stop = min(last_index, self._get_run_end(stop) + 1)
+            kept_changed = self._update_kept(start, stop)
+            if kept_changed is not None:
+                first_changed = min(first_changed, kept_changed)
+        self._discard_checkpoints(first_changed)
+
+    def _discard_checkpoints(self, index):
+        """Discards the saved states of chains that start at or after a given point. A chain that
+        starts at the point may have started because the point closed the previous chain.
+
+        Args:
+            index (integer): index of the first point that changed.
+        """
+        kept_checkpoints = max(1, bisect_left(self._checkpoint_starts, index))
+        del self._checkpoints[kept_checkpoints:]
+        del self._checkpoint_starts[kept_checkpoints:]
+
+    def _save_checkpoint(self, index, current_node):
+        """Saves the state of the removal of repeated chains before analyzing a given point.
+
+        Args:
+            index (integer): index of the next point analyzed.
+            current_node (dictionary): node of the current chain in the index of chains, or None
+            if the current chain is not in the index.
+        """
+        self._checkpoints.append(
+            (
+                index,
+                len(self._clean_points),
+                len(self._chain_log),
+                len(self._chain_points),
+                self._chain_start,
+                current_node,
+            )
+        )
+        self._checkpoint_starts.append(index)
+
+    def _add_chain_point(self, point):
+        """Adds a point to the current chain."""
+        self._chain_points.append(point)
+        self._chain_positions.setdefault(point, []).append(len(self._chain_points) - 1)
+
+    def _is_in_current_chain(self, point):
+        """Evaluates if a point is in the current chain."""
+        positions = self._chain_positions.get(point)
+        return positions is not None and positions[len(positions) - 1] >= self._chain_start
+
+    def _truncate_chain_points(self, size):
+        """Removes the chain points added after the list of chain points had the given size."""
+        chain_points = self._chain_points
+        chain_positions = self._chain_positions
+        while len(chain_points) > size:
+            point = chain_points.pop()
+            positions = chain_positions[point]
+            positions.pop()
+            if not positions:
+                del chain_positions[point]
+
+    def _add_chain(self, chain):
+        """Adds a unique chain to the index of chains, logging what was created."""
+        node = self._chains
+        created = None
+        for point in chain:
+            if point not in node:
+                if created is None:
+                    created = (node, point)
+                node[point] = {}
+            node = node[point]
+        node[CHAIN_END] = True
+        self._chain_log.append((node, created))
+
+    def _undo_chains(self, log_size):
+        """Removes the chains added to the index after the log had the given size."""
+        while len(self._chain_log) > log_size:
+            node, created = self._chain_log.pop()
+            if created is None:
+                del node[CHAIN_END]
+            else:
+                parent, point = created
+                del parent[point]
+
+    def _iter_kept_points(self, start):
+        """Gives the points kept after removing repeated and in between points, from an index.
+
+        Args:
+            start (integer): index of the first point analyzed.
+        Yields:
+            tuple: index and point of each kept point. If the closing point is not kept, the first
+            kept point is repeated at the end with the index after the last point.
+        """
+        points = self._points
+        kept = self._kept
+        for index in range(start, len(points)):
+            if kept[index]:
+                yield index, points[index]
+        # If the start point is a redundant point, it was removed. Adding the first kept point at
+        # the end ensures it is a closed polygon.
+        first_kept = kept.index(1)
+        last_kept = kept.rindex(1)
+        if points[first_kept] != points[last_kept]:
+            yield len(points), points[first_kept]
+
+    def _remove_repeated_chains(self):
+        """Removes repeated chains as iter_remove_repeated_chains, resuming from the last saved
+        state and saving a new state whenever a chain starts and every CHECKPOINT_INTERVAL points.
+
+        Returns:
+            A list of 2D coordinates: points of the clean polygon.
+        """
+        checkpoint = self._checkpoints[len(self._checkpoints) - 1]
+        start, clean_size, log_size, chain_size, chain_start, current_node = checkpoint
+        self._undo_chains(log_size)
+        del self._clean_points[clean_size:]
+        self._truncate_chain_points(chain_size)
+        self._chain_start = chain_start
+        clean_points = self._clean_points
+        chain_points = self._chain_points
+        last_index = len(self._points) - 1
+        next_checkpoint = start + CHECKPOINT_INTERVAL
+
+        for index, current_point in self._iter_kept_points(start):
+            if index >= next_checkpoint:
+                self._save_checkpoint(index, current_node)
+                next_checkpoint = index + CHECKPOINT_INTERVAL
+            # If the current point is in the current chain, then the chain is closed and a
+            # sub-polygon has been formed.
+            if self._is_in_current_chain(current_point):
+                unique = current_node is None or CHAIN_END not in current_node
+                # The chain closed by the last point is not added to the index, since no chain
+                # follows it, so a long chain is not added and undone again after every edit.
+                if index >= last_index:
+                    if unique:
+                        return clean_points + chain_points[self._chain_start :] + [current_point]
+                    return clean_points + [current_point]
+                # If the chain is unique, then it must be added to the index and to the valid points.
+                if unique:
+                    current_chain = chain_points[self._chain_start :]
+                    self._add_chain(current_chain)
+                    clean_points += current_chain
+                self._chain_start = len(chain_points)
+                current_node = self._chains
+                self._save_checkpoint(index, current_node)
+                next_checkpoint = index + CHECKPOINT_INTERVAL
+            self._add_chain_point(current_point)
+            if current_node is not None:
+                current_node = current_node.get(current_point)
+            # If the current chain is not unique, it must be discarded.
+            if current_node is not None and CHAIN_END in current_node:
+                self._chain_start = len(chain_points)
+                current_node = self._chains
+                self._save_checkpoint(index + 1, current_node)
+                next_checkpoint = index + 1 + CHECKPOINT_INTERVAL
+
+        return clean_points + chain_points[self._chain_start :]
+
+
+if __name__ == "__main__":
+    # Test scenario: a square drawn one vertex at a time, with some redundant vertices.
+    cleaner = IncrementalPolygonCleaner([(0, 0), (1, 0), (2, 0), (0, 0)])
+    for vertex in [(2, 1), (2, 2), (2, 2), (1, 2), (0, 2), (0, 1)]:
+        cleaner.append(vertex)
+        print("After appending", vertex, ":", cleaner.cleaned)
+    cleaner.delete(1)
+    print("After deleting vertex 1:", cleaner.cleaned)
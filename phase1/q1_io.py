@@ -0,0 +1,326 @@
+"""Binary files of polygon collections, and a command line interface to create and clean them.
+
+A polygon file has three parts:
+    - A header, with the format identifier, the type of the coordinates, the number of polygons
+      and points, and where the other parts start.
+    - The coordinates of all points, x0, y0, x1, y1, ... as doubles or 64 bit integers.
+    - The offsets, P + 1 64 bit integers with the index of the first point of each polygon.
+Coordinates come before the offsets so that both can be written while polygons are streamed.
+
+Usage:
+    python q1_io.py pack polygons.wkt polygons.bin
+    python q1_io.py pack polygons.csv polygons.bin --format csv --integer
+    python q1_io.py clean polygons.bin clean_polygons.bin
+    python q1_io.py dump clean_polygons.bin
+"""
+import argparse
+import csv
+import mmap
+import re
+import struct
+import sys
+from array import array
+
+from q1 import InvalidPolygonError, clean_polygon_checked
+from q1_polygon import Polygon
+
+MAGIC = b"POLYGONS"
+VERSION = 1
+# Magic, version, coordinate type, number of polygons, number of points, position of the
+# coordinates and position of the offsets, all little endian.
+HEADER = struct.Struct("<8sIcxxxqqqq")
+# Regular expression for the points of a WKT polygon with a single ring.
+WKT_POLYGON = re.compile(r"^\s*POLYGON\s*\(\s*\(([^()]*)\)\s*\)\s*$", re.IGNORECASE)
+WKT_EMPTY_POLYGON = re.compile(r"^\s*POLYGON\s+EMPTY\s*$", re.IGNORECASE)
+
+
+class PolygonWriter:
+    """Writes polygons to a polygon file one at a time. Only the offsets are kept in memory,
+    which take 8 bytes per polygon."""
+
+    def __init__(self, path, typecode="d"):
+        """Creates the file, leaving space for the header.
+
+        Args:
+            path (string): path of the file to be written.
+            typecode (char): "d" or "q", type of the coordinates.
+        """
+        if typecode not in ("d", "q"):
+            raise ValueError("Coordinates must be doubles or 64 bit integers.")
+        self.typecode = typecode
+        self.offsets = array("q", [0])
+        self.file = open(path, "wb")
+        self.file.write(bytes(HEADER.size))
+
+    def write(self, points):
+        """Appends a polygon to the file.
+
+        Args:
+            points (A Polygon or an iterable of 2D coordinates): points of the polygon.
+        """
+        if not isinstance(points, Polygon) or points.typecode != self.typecode:
+            points = Polygon(
+                array(self.typecode, (value for point in points for value in point))
+            )
+        self.file.write(memoryview(points.coordinates).cast("B"))
+        self.offsets.append(self.offsets[len(self.offsets) - 1] + len(points))
+
+    def close(self):
+        """Writes the offsets and the header, and closes the file."""
+        if self.file.closed:
+            return
+        offsets_position = self.file.tell()
+        self.offsets.tofile(self.file)
+        self.file.seek(0)
+        self.file.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                self.typecode.encode(),
+                len(self.offsets) - 1,
+                self.offsets[len(self.offsets) - 1],
+                HEADER.size,
+                offsets_position,
+            )
+        )
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+class PolygonFile:
+    """Reads a polygon file through a memory map. Polygons are views of the mapped file, so they
+    are only loaded into memory when their points are read, and only while they are in use.
+    Polygons must not be used after the file is closed."""
+
+    def __init__(self, path):
+        """Maps the file and reads its header.
+
+        Args:
+            path (string): path of the file to be read.
+        """
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            self.map.close()
+            raise ValueError("File is not a polygon file.")
+        (
+            magic,
+            version,
+            typecode,
+            polygons,
+            points,
+            coordinates_position,
+            offsets_position,
+        ) = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError("File is not a polygon file.")
+        self.typecode = typecode.decode()
+        view = memoryview(self.map)
+        self.coordinates = view[
+            coordinates_position : coordinates_position + 16 * points
+        ].cast(self.typecode)
+        self.offsets = view[offsets_position : offsets_position + 8 * (polygons + 1)].cast(
+            "q"
+        )
+        view.release()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Polygon index out of range.")
+        return Polygon(
+            self.coordinates[2 * self.offsets[index] : 2 * self.offsets[index + 1]]
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self):
+        """Releases the views of the file and unmaps it."""
+        if self.map.closed:
+            return
+        self.coordinates.release()
+        self.offsets.release()
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+def parse_number(text, typecode):
+    """Converts a coordinate read from text to the type of the coordinates.
+
+    Args:
+        text (string): the coordinate.
+        typecode (char): "d" or "q", type of the coordinates.
+    Returns:
+        number: the coordinate as a float or an integer.
+    """
+    return int(text) if typecode == "q" else float(text)
+
+
+def read_wkt_polygons(lines, typecode="d"):
+    """Reads polygons from WKT text, one POLYGON per line, with a single ring each.
+
+    Args:
+        lines (An iterable of strings): lines of the text.
+        typecode (char): "d" or "q", type of the coordinates.
+    Yields:
+        A list of 2D coordinates: points of each polygon.
+    """
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        if WKT_EMPTY_POLYGON.match(line):
+            yield []
+            continue
+        match = WKT_POLYGON.match(line)
+        if not match:
+            raise ValueError(f"Line {line_number} is not a WKT polygon with a single ring.")
+        points = []
+        for point in match.group(1).split(","):
+            x, y = point.split()
+            points.append((parse_number(x, typecode), parse_number(y, typecode)))
+        yield points
+
+
+def read_csv_polygons(lines, typecode="d"):
+    """Reads polygons from CSV text with a polygon identifier, x and y on each row. Consecutive rows
+    with the same identifier are points of the same polygon. A header row is skipped.
+
+    Args:
+        lines (An iterable of strings): lines of the text.
+        typecode (char): "d" or "q", type of the coordinates.
+    Yields:
+        A list of 2D coordinates: points of each polygon.
+    """
+    current_id = None
+    points = []
+    for row_number, row in enumerate(csv.reader(lines), 1):
+        if not row:
+            continue
+        polygon_id, x, y = row
+        try:
+            point = (parse_number(x, typecode), parse_number(y, typecode))
+        except ValueError:
+            if row_number == 1:
+                continue
+            raise
+        if polygon_id != current_id and current_id is not None:
+            yield points
+            points = []
+        current_id = polygon_id
+        points.append(point)
+    if current_id is not None:
+        yield points
+
+
+def format_wkt_polygon(points):
+    """Writes a polygon as WKT.
+
+    Args:
+        points (An iterable of 2D coordinates): points of the polygon.
+    Returns:
+        string: the WKT polygon.
+    """
+    text = ", ".join(f"{x} {y}" for x, y in points)
+    return f"POLYGON (({text}))" if text else "POLYGON EMPTY"
+
+
+def pack(input_path, output_path, input_format="wkt", typecode="d"):
+    """Converts a WKT or CSV file to a polygon file, one polygon at a time.
+
+    Args:
+        input_path (string): path of the text file.
+        output_path (string): path of the polygon file to be written.
+        input_format (string): "wkt" or "csv".
+        typecode (char): "d" or "q", type of the coordinates.
+    Returns:
+        integer: number of polygons written.
+    """
+    read_polygons = read_csv_polygons if input_format == "csv" else read_wkt_polygons
+    count = 0
+    with open(input_path, newline="") as lines, PolygonWriter(
+        output_path, typecode
+    ) as writer:
+        for points in read_polygons(lines, typecode):
+            writer.write(points)
+            count += 1
+    return count
+
+
+def clean(input_path, output_path, tolerance=None):
+    """Removes redundant points from every polygon of a polygon file. Invalid polygons are written
+    as empty polygons, so polygons keep their indexes.
+
+    Args:
+        input_path (string): path of the polygon file.
+        output_path (string): path of the polygon file to be written.
+        tolerance (number): maximum distance from a point in between a line segment to the segment,
+        or None for exact tests.
+    Returns:
+        list of tuples: index and error of each invalid polygon.
+    """
+    errors = []
+    with PolygonFile(input_path) as polygons, PolygonWriter(
+        output_path, polygons.typecode
+    ) as writer:
+        for index in range(len(polygons)):
+            try:
+                writer.write(clean_polygon_checked(polygons[index], tolerance))
+            except InvalidPolygonError as error:
+                writer.write([])
+                errors.append((index, str(error)))
+    return errors
+
+
+def main(arguments=None):
+    """Command line interface: pack text files to polygon files, clean and dump them."""
+    parser = argparse.ArgumentParser(description="Polygon files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack_parser = commands.add_parser("pack", help="convert WKT or CSV to a polygon file")
+    pack_parser.add_argument("input")
+    pack_parser.add_argument("output")
+    pack_parser.add_argument("--format", choices=("wkt", "csv"), default="wkt")
+    pack_parser.add_argument(
+        "--integer", action="store_true", help="store coordinates as integers"
+    )
+    clean_parser = commands.add_parser("clean", help="clean every polygon of a polygon file")
+    clean_parser.add_argument("input")
+    clean_parser.add_argument("output")
+    clean_parser.add_argument("--tolerance", type=float, default=None)
+    dump_parser = commands.add_parser("dump", help="print a polygon file as WKT")
+    dump_parser.add_argument("input")
+    arguments = parser.parse_args(arguments)
+
+    if arguments.command == "pack":
+        typecode = "q" if arguments.integer else "d"
+        count = pack(arguments.input, arguments.output, arguments.format, typecode)
+        print(f"Packed {count} polygons.", file=sys.stderr)
+    elif arguments.command == "clean":
+        errors = clean(arguments.input, arguments.output, arguments.tolerance)
+        for index, error in errors:
+            print(f"Polygon {index}: {error}", file=sys.stderr)
+    else:
+        with PolygonFile(arguments.input) as polygons:
+            # Polygons are only referenced while printed, so the file can be unmapped afterwards.
+            for index in range(len(polygons)):
+                print(format_wkt_polygon(polygons[index]))
+
+
+if __name__ == "__main__":
+    main()
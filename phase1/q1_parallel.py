@@ -0,0 +1,212 @@
+import os
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from q1 import InvalidPolygonError, clean_polygon_checked
+from q1_polygon import Polygon
+
+# Result of cleaning one polygon of a batch. Either points holds the cleaned polygon and error is
+# None, or points is None and error describes why the polygon could not be cleaned.
+CleaningResult = namedtuple("CleaningResult", ["index", "points", "error"])
+
+# Limits for the number of points analyzed by each task. Small polygons are grouped together so
+# the cost of a task is not dominated by communication, and large ones are left alone in a task.
+MIN_CHUNK_POINTS = 1_000
+MAX_CHUNK_POINTS = 100_000
+# Number of tasks given to each worker, so that workers that finish earlier can take more work.
+TASKS_PER_WORKER = 4
+
+
+def pack_polygons(polygons):
+    """Packs a collection of polygons into a single coordinate buffer and its offsets.
+
+    Args:
+        polygons (A list of Polygons or lists of 2D coordinates): polygons to be packed.
+    Returns:
+        coordinates (array): flat coordinates of all points, of doubles or 64 bit integers if all
+        coordinates are integers.
+        offsets (array of 64 bit integers): P + 1 point indexes of where each polygon starts.
+    """
+    typecode = "q"
+    for polygon in polygons:
+        if isinstance(polygon, Polygon):
+            if polygon.typecode != "q":
+                typecode = "d"
+        elif any(type(coordinate) is not int for point in polygon for coordinate in point):
+            typecode = "d"
+        if typecode == "d":
+            break
+
+    coordinates = array(typecode)
+    offsets = array("q", [0])
+    for polygon in polygons:
+        if isinstance(polygon, Polygon) and polygon.typecode == typecode:
+            coordinates.frombytes(memoryview(polygon.coordinates).cast("B"))
+        else:
+            coordinates.extend(coordinate for point in polygon for coordinate in point)
+        offsets.append(len(coordinates) // 2)
+    return coordinates, offsets
+
+
+def get_chunks(offsets, chunk_points):
+    """Splits a collection of polygons into chunks of consecutive polygons, each with about the
+    given number of points.
+
+    Args:
+        offsets (array of integers): P + 1 point indexes of where each polygon starts.
+        chunk_points (integer): number of points after which a chunk is closed.
+    Returns:
+        list of tuples: start and stop polygon indexes of each chunk.
+    """
+    chunks = []
+    start = 0
+    for stop in range(1, len(offsets)):
+        if offsets[stop] - offsets[start] >= chunk_points:
+            chunks.append((start, stop))
+            start = stop
+    if start < len(offsets) - 1:
+        chunks.append((start, len(offsets) - 1))
+    return chunks
+
+
+def clean_shared_polygons(coordinates, offsets, start, stop, tolerance):
+    """Cleans a chunk of polygons whose points are in shared buffers.
+
+    Args:
+        coordinates (memoryview): flat coordinates of all points.
+        offsets (memoryview): P + 1 point indexes of where each polygon starts.
+        start (integer): index of the first polygon of the chunk.
+        stop (integer): index after the last polygon of the chunk.
+        tolerance (number): maximum distance from a point in between a line segment to the segment,
+        or None for exact tests.
+    Returns:
+        list of CleaningResult: results of the chunk, with the clean points as compact arrays.
+    """
+    results = []
+    for index in range(start, stop):
+        # The polygon is a view of the shared buffer, so no points are copied to be analyzed.
+        polygon = Polygon(coordinates[2 * offsets[index] : 2 * offsets[index + 1]])
+        try:
+            clean_points = clean_polygon_checked(polygon, tolerance)
+            results.append(CleaningResult(index, clean_points.coordinates, None))
+        except InvalidPolygonError as error:
+            results.append(CleaningResult(index, None, str(error)))
+    return results
+
+
+def clean_polygon_chunk(coordinates_name, offsets_name, typecode, start, stop, tolerance):
+    """Task run by the workers: attaches to the shared buffers and cleans a chunk of polygons.
+
+    Args:
+        coordinates_name (string): name of the shared memory with the coordinates.
+        offsets_name (string): name of the shared memory with the offsets.
+        typecode (char): "d" or "q", type of the coordinates.
+        start (integer): index of the first polygon of the chunk.
+        stop (integer): index after the last polygon of the chunk.
+        tolerance (number): maximum distance from a point in between a line segment to the segment,
+        or None for exact tests.
+    Returns:
+        list of CleaningResult: results of the chunk, with the clean points as compact arrays.
+    """
+    coordinates_memory = SharedMemory(name=coordinates_name)
+    offsets_memory = SharedMemory(name=offsets_name)
+    try:
+        # Every view of the shared buffers is released when this call returns, which allows
+        # the shared memory to be closed.
+        return clean_shared_polygons(
+            coordinates_memory.buf.cast(typecode),
+            offsets_memory.buf.cast("q"),
+            start,
+            stop,
+            tolerance,
+        )
+    finally:
+        coordinates_memory.close()
+        offsets_memory.close()
+
+
+def copy_to_shared_memory(values):
+    """Copies an array to a new block of shared memory.
+
+    Args:
+        values (array): values to be shared.
+    Returns:
+        SharedMemory: the block of shared memory, which must be unlinked by the caller.
+    """
+    data = memoryview(values).cast("B")
+    # Shared memory blocks cannot be empty.
+    memory = SharedMemory(create=True, size=max(1, len(data)))
+    memory.buf[: len(data)] = data
+    return memory
+
+
+def clean_polygons_parallel(
+    polygons, tolerance=None, max_workers=None, chunk_points=None
+):
+    """Removes redundant points from every polygon of a collection, sharing the work between
+    processes. Points are given to the workers through shared memory instead of being copied.
+
+    Args:
+        polygons (A list of Polygons or lists of 2D coordinates): polygons to be cleaned.
+        tolerance (number): maximum distance from a point in between a line segment to the segment,
+        or None for exact tests.
+        max_workers (integer): number of processes, or None to use one per CPU.
+        chunk_points (integer): number of points analyzed by each task, or None to choose it from
+        the size of the collection.
+    Returns:
+        list of CleaningResult: one result per polygon, in the same order as the polygons given.
+        Cleaned polygons are Polygons, and invalid ones have the reason in the error field.
+    """
+    coordinates, offsets = pack_polygons(polygons)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if chunk_points is None:
+        chunk_points = len(coordinates) // 2 // (max_workers * TASKS_PER_WORKER)
+        chunk_points = min(MAX_CHUNK_POINTS, max(MIN_CHUNK_POINTS, chunk_points))
+    chunks = get_chunks(offsets, chunk_points)
+
+    typecode = coordinates.typecode
+    coordinates_memory = copy_to_shared_memory(coordinates)
+    offsets_memory = copy_to_shared_memory(offsets)
+    # The packed copies are no longer needed once they are in shared memory.
+    del coordinates, offsets
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    clean_polygon_chunk,
+                    coordinates_memory.name,
+                    offsets_memory.name,
+                    typecode,
+                    start,
+                    stop,
+                    tolerance,
+                )
+                for start, stop in chunks
+            ]
+            # Chunks are collected in the order they were submitted, which keeps the input order.
+            for future in futures:
+                for result in future.result():
+                    if result.points is not None:
+                        result = result._replace(points=Polygon(result.points))
+                    results.append(result)
+    finally:
+        coordinates_memory.close()
+        coordinates_memory.unlink()
+        offsets_memory.close()
+        offsets_memory.unlink()
+    return results
+
+
+if __name__ == "__main__":
+    # Test scenario: a valid polygon, a polygon that is not closed and a square with extra points.
+    polygons = [
+        [(0, 0), (0, 1), (0, 0), (0, 0), (0, 1), (1, 1), (2, 1), (1, 0), (0, 0)],
+        [(0, 0), (1, 1)],
+        [(0, 0), (1, 0), (2, 0), (2, 2), (2, 2), (0, 2), (0, 0)],
+    ]
+    for result in clean_polygons_parallel(polygons):
+        print(result.index, result.points, result.error)
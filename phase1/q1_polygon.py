@@ -0,0 +1,208 @@
+import sys
+from array import array
+from collections.abc import Sequence
+
+from q1_predicates import is_point_between
+
+
+class Polygon(Sequence):
+    """Points of a polygon stored in a single flat buffer of coordinates x0, y0, x1, y1, ...
+    The buffer is either an array of doubles ("d") or of 64 bit integers ("q"), or a memoryview
+    of one of those formats, such as a view of a memory-mapped file.
+
+    Indexing gives the points as 2D coordinates, so a Polygon can be used wherever a list of points
+    is expected. The buffer can be wrapped without copies, either with memoryview(polygon)
+    (Python 3.12 onwards), memoryview(polygon.coordinates) or numpy.asarray(polygon).
+    """
+
+    __slots__ = ("coordinates",)
+
+    def __init__(self, coordinates=(), typecode="d"):
+        """Creates a polygon from a buffer of coordinates.
+
+        Args:
+            coordinates (array, buffer or iterable of numbers): flat coordinates of the points.
+            Arrays and buffers of doubles or 64 bit integers are used without copies.
+            typecode (char): "d" or "q", type of the array created when coordinates must be copied.
+        """
+        if isinstance(coordinates, array) and coordinates.typecode in ("d", "q"):
+            self.coordinates = coordinates
+        elif isinstance(coordinates, (array, list, tuple)):
+            self.coordinates = array(typecode, coordinates)
+        else:
+            coordinates = memoryview(coordinates)
+            code = coordinates.format.lstrip("@=<>!")
+            byte_order = coordinates.format[: len(coordinates.format) - len(code)]
+            if byte_order in (">", "!") if sys.byteorder == "little" else byte_order == "<":
+                raise ValueError("Coordinates must be in the native byte order.")
+            if code == "d":
+                typecode = "d"
+            elif code in ("l", "q") and coordinates.itemsize == 8:
+                typecode = "q"
+            else:
+                raise ValueError(
+                    f"Coordinates must be doubles or 64 bit integers, not {coordinates.format!r}."
+                )
+            # Buffers with other formats of the same type, or with more than one dimension such as
+            # (N, 2) arrays, are viewed as flat buffers of the type.
+            if coordinates.format != typecode or coordinates.ndim != 1:
+                if not coordinates.c_contiguous:
+                    raise ValueError("Coordinates must be a contiguous buffer.")
+                coordinates = coordinates.cast("B").cast(typecode)
+            self.coordinates = coordinates
+        if len(self.coordinates) % 2 != 0:
+            raise ValueError("Coordinates must have an even number of values.")
+
+    @classmethod
+    def from_points(cls, points, typecode=None):
+        """Creates a polygon from 2D coordinates, copying them to a new buffer.
+
+        Args:
+            points (An iterable of 2D coordinates): points of the polygon.
+            typecode (char): "d" or "q", type of the buffer. If None, "q" is used when all
+            coordinates are integers and "d" otherwise.
+        Returns:
+            Polygon: the polygon with the given points.
+        """
+        coordinates = [coordinate for point in points for coordinate in point]
+        if typecode is None:
+            typecode = "d"
+            if all(type(coordinate) is int for coordinate in coordinates):
+                typecode = "q"
+        return cls(array(typecode, coordinates))
+
+    @property
+    def typecode(self):
+        """char: "d" if the coordinates are doubles and "q" if they are 64 bit integers."""
+        if isinstance(self.coordinates, array):
+            return self.coordinates.typecode
+        return self.coordinates.format
+
+    def __len__(self):
+        return len(self.coordinates) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            # Contiguous slices are views of the same buffer.
+            if step == 1:
+                stop = max(start, stop)
+                return Polygon(memoryview(self.coordinates)[2 * start : 2 * stop])
+            return self.take(range(start, stop, step))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Polygon index out of range.")
+        return (self.coordinates[2 * index], self.coordinates[2 * index + 1])
+
+    def __iter__(self):
+        coordinates = iter(self.coordinates)
+        return zip(coordinates, coordinates)
+
+    def __eq__(self, other):
+        if isinstance(other, Polygon):
+            return len(self) == len(other) and memoryview(
+                self.coordinates
+            ) == memoryview(other.coordinates)
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(
+                point == tuple(other_point) for point, other_point in zip(self, other)
+            )
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Polygon({list(self)})"
+
+    def __buffer__(self, flags):
+        return memoryview(self.coordinates)
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+
+        points = np.frombuffer(self.coordinates, dtype=self.typecode).reshape(-1, 2)
+        if dtype is not None or copy:
+            return points.astype(dtype or points.dtype, copy=bool(copy))
+        return points
+
+    def to_points(self):
+        """Gives the points of the polygon as a list of 2D coordinates.
+
+        Returns:
+            A list of 2D coordinates: points of the polygon.
+        """
+        return list(self)
+
+    def take(self, indexes):
+        """Copies the selected points to a new compact buffer.
+
+        Args:
+            indexes (An iterable of integers): indexes of the points to keep, in order.
+        Returns:
+            Polygon: a polygon with only the selected points.
+        """
+        coordinates = self.coordinates
+        compact_coordinates = array(self.typecode)
+        for index in indexes:
+            compact_coordinates.append(coordinates[2 * index])
+            compact_coordinates.append(coordinates[2 * index + 1])
+        return Polygon(compact_coordinates)
+
+    def is_point_repeated(self, index, other_index):
+        """Evaluates if two points of the polygon are the same, without creating them.
+
+        Args:
+            index (integer): index of the first point.
+            other_index (integer): index of the second point.
+        Returns:
+            boolean: whether both points have the same coordinates.
+        """
+        coordinates = self.coordinates
+        return (
+            coordinates[2 * index] == coordinates[2 * other_index]
+            and coordinates[2 * index + 1] == coordinates[2 * other_index + 1]
+        )
+
+    def remove_consecutive_repeated_points(self):
+        """Removes consecutively repeated points, which add no new information to the polygon.
+
+        Returns:
+            Polygon: a compact polygon without redundant points.
+        """
+        last_index = len(self) - 1
+        # Indexes of points that are different than their consecutive point, and the last point.
+        indexes = array("q")
+        for i in range(last_index):
+            if not self.is_point_repeated(i, i + 1):
+                indexes.append(i)
+        indexes.append(last_index)
+        return self.take(indexes)
+
+    def remove_in_between_points(self, tolerance=None):
+        """Removes points that do not define line segments from the polygon.
+        In other words, points that are "in between" two other points.
+
+        Args:
+            tolerance (number): maximum distance from a removed point to its segment, or None for
+            exact tests.
+        Returns:
+            Polygon: a compact polygon without redundant points.
+        """
+        size = len(self)
+        # Neighbours are taken in a circular manner: the first point comes after the second last
+        # point, and the last point comes before the second point.
+        indexes = array("q")
+        for i in range(size):
+            previous_index = i - 1 if i > 0 else size - 2
+            next_index = i + 1 if i < size - 1 else 1
+            if not is_point_between(
+                self[previous_index], self[i], self[next_index], tolerance
+            ):
+                indexes.append(i)
+
+        # If the start point is a redundant point, it was removed. Adding the new starting point at
+        # the end of the polygon will ensure it is closed.
+        if not self.is_point_repeated(indexes[0], indexes[len(indexes) - 1]):
+            indexes.append(indexes[0])
+        return self.take(indexes)
@@ -0,0 +1,171 @@
+import numbers
+from fractions import Fraction
+
+# Relative error bound of the floating point evaluation of a sum or difference of two products of
+# coordinate differences, as given by Shewchuk for the 2D orientation test. Results larger than the
+# bound times the sum of the absolute values of the products are certain to have the right sign.
+EPSILON = 2.0**-53
+ERROR_BOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+
+
+def are_coordinates_integer(*coordinates):
+    """Evaluates if all given coordinates are integers, whose arithmetic is always exact.
+
+    Args:
+        coordinates (numbers): coordinates to be analyzed.
+    Returns:
+        boolean: whether all coordinates are integers.
+    """
+    for coordinate in coordinates:
+        if type(coordinate) is not int:
+            return False
+    return True
+
+
+def as_python_number(coordinate):
+    """Converts a coordinate to a Python number. Coordinates such as NumPy scalars would otherwise
+    overflow silently in integer products, and give NumPy booleans in comparisons.
+
+    Args:
+        coordinate (number): coordinate to be converted.
+    Returns:
+        number: the coordinate as an integer if it is integral, unchanged if it is a float or a
+        fraction, and as a float otherwise.
+    """
+    if type(coordinate) is int or type(coordinate) is float:
+        return coordinate
+    if isinstance(coordinate, numbers.Integral):
+        return int(coordinate)
+    if isinstance(coordinate, Fraction):
+        return coordinate
+    return float(coordinate)
+
+
+def get_products_sign(first_product, second_product, subtract):
+    """Gives the sign of the sum (or difference) of two products of coordinate differences.
+    The floating point result is used when its error bound guarantees the sign, otherwise the
+    coordinates are converted to fractions, which represent floats exactly.
+
+    Args:
+        first_product (tuple of 4 numbers): coordinates x1, y1, x2, y2 of the product (x1 - y1) * (x2 - y2).
+        second_product (tuple of 4 numbers): coordinates of the second product, in the same format.
+        subtract (boolean): whether the second product is subtracted from the first instead of added.
+    Returns:
+        integer: 1 if the result is positive, -1 if it is negative and 0 if it is null.
+    """
+    if not are_coordinates_integer(*first_product, *second_product):
+        first_product = [as_python_number(coordinate) for coordinate in first_product]
+        second_product = [as_python_number(coordinate) for coordinate in second_product]
+    if are_coordinates_integer(*first_product, *second_product):
+        left = (first_product[0] - first_product[1]) * (first_product[2] - first_product[3])
+        right = (second_product[0] - second_product[1]) * (
+            second_product[2] - second_product[3]
+        )
+        result = left - right if subtract else left + right
+        return (result > 0) - (result < 0)
+
+    # Fast path: floating point evaluation, trusted only if larger than its error bound.
+    left = (first_product[0] - first_product[1]) * (first_product[2] - first_product[3])
+    right = (second_product[0] - second_product[1]) * (
+        second_product[2] - second_product[3]
+    )
+    result = left - right if subtract else left + right
+    if abs(result) > ERROR_BOUND * (abs(left) + abs(right)):
+        return (result > 0) - (result < 0)
+
+    # Exact path: the same evaluation with fractions.
+    first_product = [Fraction(coordinate) for coordinate in first_product]
+    second_product = [Fraction(coordinate) for coordinate in second_product]
+    left = (first_product[0] - first_product[1]) * (first_product[2] - first_product[3])
+    right = (second_product[0] - second_product[1]) * (
+        second_product[2] - second_product[3]
+    )
+    result = left - right if subtract else left + right
+    return (result > 0) - (result < 0)
+
+
+def get_orientation(point_a, point_b, point_c):
+    """Gives the orientation of three points, which is the sign of the cross product of the vectors
+    from point c to point a and from point c to point b.
+
+    Args:
+        point_a (2D coordinate): Given point a
+        point_b (2D coordinate): Given point b
+        point_c (2D coordinate): Given point c
+    Returns:
+        integer: 1 if the points turn counterclockwise, -1 if clockwise and 0 if they are collinear.
+    """
+    return get_products_sign(
+        (point_a[0], point_c[0], point_b[1], point_c[1]),
+        (point_a[1], point_c[1], point_b[0], point_c[0]),
+        True,
+    )
+
+
+def is_point_between(point_a, between_point, point_b, tolerance=None):
+    """Evaluates if a point is contained in the same line segment defined by point a and point b.
+    The point is in the segment when it is collinear with both points and the vectors from it to
+    each of them do not point to the same side, which is evaluated exactly, without square roots.
+    With a tolerance, the point is in the segment when it is at most that distance away from it.
+
+    Args:
+        point_a (2D coordinate): Given point a
+        between_point (2D coordinate): point to be analyzed if it is between point a and point b
+        point_b (2D coordinate): Given point b
+        tolerance (number): maximum distance from the point to the segment, or None for exact tests.
+    Returns:
+        boolean: whether the point is in the same line segment defined by point a and point b
+    """
+    if tolerance is not None:
+        return get_squared_distance_to_segment(point_a, between_point, point_b) <= (
+            tolerance * tolerance
+        )
+    if get_orientation(point_a, point_b, between_point) != 0:
+        return False
+    # Sign of the dot product of the vectors from the point to point a and to point b.
+    return (
+        get_products_sign(
+            (point_a[0], between_point[0], point_b[0], between_point[0]),
+            (point_a[1], between_point[1], point_b[1], between_point[1]),
+            False,
+        )
+        <= 0
+    )
+
+
+def get_squared_distance_to_segment(point_a, point, point_b):
+    """Gives the squared distance from a point to the line segment defined by point a and point b.
+
+    Args:
+        point_a (2D coordinate): Given point a
+        point (2D coordinate): point whose distance is measured
+        point_b (2D coordinate): Given point b
+    Returns:
+        float: the squared distance from the point to the closest point of the segment.
+    """
+    segment_x = point_b[0] - point_a[0]
+    segment_y = point_b[1] - point_a[1]
+    point_x = point[0] - point_a[0]
+    point_y = point[1] - point_a[1]
+    squared_length = segment_x * segment_x + segment_y * segment_y
+    # Position of the projection of the point on the segment, limited to the segment ends.
+    position = 0.0
+    if squared_length > 0:
+        position = (point_x * segment_x + point_y * segment_y) / squared_length
+        position = min(1.0, max(0.0, position))
+    distance_x = point_x - position * segment_x
+    distance_y = point_y - position * segment_y
+    return distance_x * distance_x + distance_y * distance_y
+
+
+if __name__ == "__main__":
+    import numpy as np
+
+    # Test scenario: the same points as Python numbers and as NumPy scalars, whose products would
+    # overflow 64 bit integers.
+    points = [(0, 0), (2**40, 2**40), (2**41, 2**41 + 1)]
+    for point_list in [points, [tuple(point) for point in np.array(points, dtype=np.int64)]]:
+        print(get_orientation(*point_list), is_point_between(*point_list))
+    points = [(0.0, 0.0), (0.5, 0.5), (1.0, 1.0)]
+    for point_list in [points, [tuple(point) for point in np.array(points)]]:
+        print(get_orientation(*point_list), is_point_between(*point_list))
@@ -1,4 +1,4 @@
-import math
+from q1_predicates import is_point_between
 
 # Definition of the polygon to be analyzed
 points = [
@@ -28,28 +28,14 @@ def is_polygon_valid(polygon_points):
     return polygon_points[0] == polygon_points[len(polygon_points) - 1]
 
 
-def is_point_between(point_a, between_point, point_b):
-    """Evaluates if a point is contained in the same line segment defined by point a and point b.
-
-    Args:
-        point_a (2D coordinate): Given point a
-        between_point (2D coordinate): point to be analyzed if it is between point a and point b
-        point_b (2D coordinate): Given point b
-    Returns:
-        boolean: whether the point is in the same line segment defined by point a and point b
-    """
-    test_distance = math.dist(point_a, between_point) + math.dist(
-        between_point, point_b
-    )
-    return math.dist(point_a, point_b) == test_distance
-
-
-def remove_in_between_points(points):
+def remove_in_between_points(points, tolerance=None):
     """Removes points that do not define line segments from a list of points that define a polygon.
     In other words, points that are "in between" two other points.
 
     Args:
         points (A list of 2D coordinates): points of the polygon.
+        tolerance (number): maximum distance from a removed point to its segment, or None for
+        exact tests.
     Returns:
         clean_points (A list of 2D coordinates): points of the polygon without redundant points.
     """
@@ -65,7 +51,9 @@ def remove_in_between_points(points):
     for i in range(1, len(aux_points) - 1):
         # If the point is not contained in a line segment between the previous and
         # next point, add it to the list of valid points.
-        if not is_point_between(aux_points[i - 1], aux_points[i], aux_points[i + 1]):
+        if not is_point_between(
+            aux_points[i - 1], aux_points[i], aux_points[i + 1], tolerance
+        ):
             clean_points.append(aux_points[i])
 
     # If the start point is a redundant point, it was removed. Adding the new starting point at
@@ -76,11 +64,13 @@ def remove_in_between_points(points):
     return clean_points
 
 
-def clean_polygon(points):
+def clean_polygon(points, tolerance=None):
     """Removes redundant points from a list of points that define a polygon.
 
     Args:
         points (A list of 2D coordinates): points of the polygon.
+        tolerance (number): maximum distance from a point in between a line segment to the segment,
+        or None for exact tests.
     Returns:
         clean_points (A list of 2D coordinates): points of the polygon without redundant points.
     """
@@ -90,7 +80,7 @@ def clean_polygon(points):
         return []
 
     # Now, apply all the functions for removing redundant points.
-    aux_points = remove_in_between_points(points)
+    aux_points = remove_in_between_points(points, tolerance)
 
     # Tests if the newly generated polygon is valid according to format.
     if not is_polygon_valid(aux_points):
@@ -100,6 +90,7 @@ def clean_polygon(points):
     return aux_points
 
 
-# Test scenario.
-print("Before list reduction: ", points)
-print("After list reduction: ", clean_polygon(points))
+if __name__ == "__main__":
+    # Test scenario.
+    print("Before list reduction: ", points)
+    print("After list reduction: ", clean_polygon(points))
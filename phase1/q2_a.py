@@ -30,5 +30,6 @@ def is_brackets_syntax_correct(string):
     return True
 
 
-# Verify a given case.
-print(is_brackets_syntax_correct(brackets))
+if __name__ == "__main__":
+    # Verify a given case.
+    print(is_brackets_syntax_correct(brackets))
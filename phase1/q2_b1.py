@@ -1,40 +1,39 @@
-brackets = "({}([ab])d{()}(c))"
-
-opening_brackets = ["(", "{", "["]
-closing_brackets = [")", "}", "]"]
+from q2_spec import get_bracket_spec
 
-closing_brackets_dict = {
-    "(": ")",
-    "{": "}",
-    "[": "]",
-}
+brackets = "({}([ab])d{()}(c))"
 
 
-def is_brackets_syntax_correct(string):
+def is_brackets_syntax_correct(string, spec=None):
     """Function that verifies if a string of brackets has a correct or incorrect syntax.
 
     Args:
-        A string containing brackets and other characters.
+        string (string or bytes): A string containing brackets and other characters.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
     Returns:
         boolean: True if the syntax is correct and False if it is incorrect.
     """
+    spec = get_bracket_spec(spec)
+    closing_brackets_dict = spec.closing_brackets_dict
+    # Characters that are not brackets are dropped at once, so only brackets are analyzed.
+    string = spec.strip(string)
+    if isinstance(string, (bytes, bytearray)):
+        string = string.decode("latin-1")
     # This is a stack containing all unclosed brackets.
     bracket_stack = []
     for character in string:
         # If an opening bracket is met, then it is stacked.
-        if character in opening_brackets:
+        if character in closing_brackets_dict:
             bracket_stack.append(character)
         # If a closing bracket is met, then an element of the stack must be popped.
         # If no other elements exist, then the syntax is wrong since there is a closing bracket
         # without its opening counterpart.
-        elif character in closing_brackets:
-            if bracket_stack:
-                popped_bracket = bracket_stack.pop()
-                # If the popped bracket is different than its closing counterpart, the syntax is wrong.
-                if character != closing_brackets_dict[popped_bracket]:
-                    return False
-            else:
+        elif bracket_stack:
+            popped_bracket = bracket_stack.pop()
+            # If the popped bracket is different than its closing counterpart, the syntax is wrong.
+            if character != closing_brackets_dict[popped_bracket]:
                 return False
+        else:
+            return False
 
     # If the bracket stack is not completely empty after looking at all characters, then an
     # opening bracket does not have a closing counterpart, which means the syntax is wrong.
@@ -43,5 +42,6 @@ def is_brackets_syntax_correct(string):
     return True
 
 
-# Verify a given case.
-print(is_brackets_syntax_correct(brackets))
+if __name__ == "__main__":
+    # Verify a given case.
+    print(is_brackets_syntax_correct(brackets))
@@ -1,22 +1,204 @@
+import time
+from bisect import bisect_left
+from collections import namedtuple
+from itertools import chain
+
+from q2_spec import get_bracket_spec
+
 syntax_input = "({a"
 
-opening_brackets = ["(", "{", "["]
-closing_brackets = [")", "}", "]"]
+# Candidate syntax of the search for fixes, with the states of its analysis. States are the stacks
+# of unclosed brackets before each index from start on. Indexes before start have the same states
+# as in the parent candidate, since the candidate was made by inserting a bracket at start.
+SyntaxCandidate = namedtuple("SyntaxCandidate", ["string", "parent", "start", "states"])
+
+
+def get_shift_mismatch(base, start, shift, stop):
+    """Finds the first index from which a string differs from itself shifted by some characters,
+    comparing slices of growing size, so that long matching runs are compared in bulk.
+
+    Args:
+        base (string): the string.
+        start (integer): first index compared.
+        shift (integer): number of characters between the compared characters.
+        stop (integer): index after the last index compared, at most the length minus the shift.
+    Returns:
+        integer: the first index i from start on where base[i] differs from base[i + shift], or
+        stop if there is none.
+    """
+    length = 1
+    while start < stop:
+        end = min(stop, start + length)
+        if base[start:end] != base[start + shift : end + shift]:
+            # The first difference is in this slice, which is halved until it is found.
+            while end - start > 1:
+                middle = (start + end) // 2
+                if base[start:middle] == base[start + shift : middle + shift]:
+                    start = middle
+                else:
+                    end = middle
+            return start
+        start = end
+        length *= 2
+    return stop
+
+
+def get_canonical_insertions(base, insertions):
+    """Function that rewrites the insertions made in a string so that equal strings have equal
+    insertions. The characters of the string are matched as early as possible, which means an
+    inserted character is never the same as the character of the string that follows it.
+
+    Args:
+        base (string): the string where characters are inserted.
+        insertions (tuple): sorted tuples of an index of the string and a character inserted
+        before it.
+    Returns:
+        tuple: the canonical insertions, in the same format.
+    """
+    canonical = []
+    size = len(base)
+    # Index of the next character of the string to be matched, and of the next character of the
+    # string in the edited string. Both are the same unless an inserted character was matched.
+    pointer = 0
+    base_index = 0
+    for gap, character in chain(insertions, [(size, None)]):
+        while base_index < gap:
+            # Characters of the string are matched to themselves until the next insertion.
+            if pointer == base_index:
+                pointer = base_index = gap
+                break
+            # Otherwise each character is matched to the one that many characters later, until
+            # the first that differs, which is inserted. Runs of the same character are skipped
+            # in bulk, as an inserted bracket is moved past the run of equal brackets it starts.
+            shift = pointer - base_index
+            matched_index = get_shift_mismatch(base, base_index, shift, min(gap, size - shift))
+            pointer += matched_index - base_index
+            base_index = matched_index
+            if base_index < gap:
+                canonical.append((pointer, base[base_index]))
+                base_index += 1
+        if character is None:
+            break
+        if pointer < size and character == base[pointer]:
+            pointer += 1
+        else:
+            canonical.append((pointer, character))
+    return tuple(canonical)
+
+
+class EditedSyntax:
+    """A string with some inserted characters, kept as the original string and the list of
+    insertions, so that candidate fixes do not copy the whole string. The edited string is only
+    built when it is converted to a string, and can be read by index or iterated without it.
+
+    Insertions are canonical, so two edited syntaxes of the same string are equal if and only if
+    their edited strings are equal.
+    """
+
+    __slots__ = ("base", "insertions", "_positions")
+
+    def __init__(self, base, insertions=()):
+        """Creates an edited syntax.
+
+        Args:
+            base (string): the original string.
+            insertions (tuple): sorted tuples of an index of the string and a character inserted
+            before it, in the order they appear.
+        """
+        self.base = base
+        self.insertions = get_canonical_insertions(base, insertions)
+        # Index of each inserted character in the edited string.
+        self._positions = [gap + i for i, (gap, _) in enumerate(self.insertions)]
+
+    def __len__(self):
+        return len(self.base) + len(self.insertions)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Edited syntax index out of range.")
+        inserted = bisect_left(self._positions, index)
+        if inserted < len(self._positions) and self._positions[inserted] == index:
+            return self.insertions[inserted][1]
+        return self.base[index - inserted]
+
+    def __iter__(self):
+        return self.iter_from(0)
 
-closing_brackets_dict = {
-    "(": ")",
-    "{": "}",
-    "[": "]",
-}
+    def iter_from(self, start):
+        """Iterates over the characters of the edited string from an index, without building it."""
+        inserted = bisect_left(self._positions, start)
+        base_index = start - inserted
+        base = self.base
+        parts = []
+        for gap, character in self.insertions[inserted:]:
+            parts.append(map(base.__getitem__, range(base_index, gap)))
+            parts.append(character)
+            base_index = gap
+        parts.append(map(base.__getitem__, range(base_index, len(base))))
+        return chain.from_iterable(parts)
 
-opening_brackets_dict = {
-    ")": "(",
-    "}": "{",
-    "]": "[",
-}
+    def iter_reversed(self, stop):
+        """Iterates backwards over the characters of the edited string before an index."""
+        inserted = bisect_left(self._positions, stop)
+        base_index = stop - inserted
+        base = self.base
+        parts = []
+        for gap, character in reversed(self.insertions[:inserted]):
+            parts.append(map(base.__getitem__, range(base_index - 1, gap - 1, -1)))
+            parts.append(character)
+            base_index = gap
+        parts.append(map(base.__getitem__, range(base_index - 1, -1, -1)))
+        return chain.from_iterable(parts)
 
+    def insert(self, index, character):
+        """Gives a new edited syntax with a character inserted before an index of the edited string."""
+        inserted = bisect_left(self._positions, index)
+        return EditedSyntax(
+            self.base,
+            self.insertions[:inserted]
+            + ((index - inserted, character),)
+            + self.insertions[inserted:],
+        )
 
-def backtrack_missing_open_bracket(error_index, stack, bracket_to_insert, string):
+    def __str__(self):
+        parts = []
+        base_index = 0
+        for gap, character in self.insertions:
+            parts.append(self.base[base_index:gap])
+            parts.append(character)
+            base_index = gap
+        parts.append(self.base[base_index:])
+        return "".join(parts)
+
+    def __eq__(self, other):
+        if not isinstance(other, EditedSyntax):
+            return NotImplemented
+        return self.base == other.base and self.insertions == other.insertions
+
+    def __hash__(self):
+        return hash(self.insertions)
+
+    def __repr__(self):
+        return f"EditedSyntax({self.base!r}, {self.insertions!r})"
+
+
+def iter_characters(string, start=0):
+    """Iterates over the characters of a string or an edited syntax from an index."""
+    if isinstance(string, EditedSyntax):
+        return string.iter_from(start)
+    return map(string.__getitem__, range(start, len(string)))
+
+
+def iter_reversed_characters(string, stop):
+    """Iterates backwards over the characters of a string or an edited syntax before an index."""
+    if isinstance(string, EditedSyntax):
+        return string.iter_reversed(stop)
+    return map(string.__getitem__, range(stop - 1, -1, -1))
+
+
+def backtrack_missing_open_bracket(error_index, stack, bracket_to_insert, string, spec=None):
     """Function that backtracks the syntax from a given index where an error of a missing
     opening bracket occurred (closed bracket was found with no open bracket in the stack).
     It analyzes each point that it can insert a bracket to fix it and returns a list of
@@ -27,10 +209,12 @@ def backtrack_missing_open_bracket(error_index, stack, bracket_to_insert, string
         stack (list of chars): contains the stack of syntax analysis when the error was found
         bracket_to_insert (char): contains the character to be inserted to fix the error
         string (string): contains the original syntax to be fixed.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
     Returns:
         possible_syntaxes (list of strings): A list of correct syntax corrections derived from
         the original string.
     """
+    spec = get_bracket_spec(spec)
     # List of possible syntaxes to be filled and returned.
     possible_syntaxes = []
     backtrack_stack = stack.copy()
@@ -42,14 +226,14 @@ def backtrack_missing_open_bracket(error_index, stack, bracket_to_insert, string
     for i in reversed(range(error_index)):
         character = string[i]
         # Reverse logic from the analysis: if it is a opening bracket, it must pop.
-        if character in opening_brackets:
+        if character in spec.opening_brackets:
             if backtrack_stack:
                 backtrack_stack.pop()
             else:
                 break
         # Reverse logic: if there is a closing bracket, it must append its opening counterpart.
-        elif character in closing_brackets:
-            backtrack_stack.append(opening_brackets_dict[character])
+        elif character in spec.closing_brackets:
+            backtrack_stack.append(spec.opening_brackets_dict[character])
         # If the stack is smaller than when it was when the error was encountered, no further
         # positions to fix the error exist.
         if len(backtrack_stack) < len(stack):
@@ -62,23 +246,25 @@ def backtrack_missing_open_bracket(error_index, stack, bracket_to_insert, string
     return possible_syntaxes
 
 
-def get_possible_closing_placements(lone_i, string):
+def get_possible_closing_placements(lone_i, string, spec=None):
     """Function that, given the index of where a lone open bracket exists on the string,
     gives the possible placements to fix the lone open bracket.
 
     Args:
         lone_i (integer): The index of the lone open bracket on the string.
         string (string): The syntax to be fixed.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
     Returns:
         possible_syntaxes (list of strings): A list of syntax corrections derived from
         the original string.
     """
+    spec = get_bracket_spec(spec)
     # An empty stack to analyze where the placements are valid.
     stack = []
     # List with all the possible syntaxes to correct the given error.
     possible_syntaxes = []
     # Obtaining the correct bracket to insert to fix the error.
-    character_to_insert = closing_brackets_dict[string[lone_i]]
+    character_to_insert = spec.closing_brackets_dict[string[lone_i]]
     # Looping the string after the lone open bracket. The last extra iteration allows the placement
     # of a closing bracket at the end of the string (after all characters) if possible.
     for i in range(lone_i + 1, len(string) + 1):
@@ -92,39 +278,46 @@ def get_possible_closing_placements(lone_i, string):
             # Just like the regular analysis, the stack should be popped. Validity of what
             # character it is and what has been popped is unnecessary since the string has
             # already been checked.
-            if character in closing_brackets:
+            if character in spec.closing_brackets:
                 if stack:
                     stack.pop()
                 else:
                     break
             # Just like the regular analysis, if an opening bracket appears, stack it.
-            elif character in opening_brackets:
+            elif character in spec.opening_brackets:
                 stack.append(character)
     return possible_syntaxes
 
 
-def fix_brackets_syntax(string):
+def fix_brackets_syntax(string, spec=None):
     """Function that given a string, finds the first bracket syntax error it encounters and
     outputs every single possible fix for that error.
 
     Args:
-        A string containing brackets and other characters.
+        string (string): A string containing brackets and other characters.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
     Returns:
         list of strings: A list of corrected syntax brackets (only contains itself if
         it is already correct)
     """
+    spec = get_bracket_spec(spec)
+    closing_brackets_dict = spec.closing_brackets_dict
+    opening_brackets_dict = spec.opening_brackets_dict
     # This is a stack containing all unclosed brackets.
     bracket_stack = []
     bracket_index_stack = []
-    for index, character in enumerate(string):
+    # Characters that are not brackets are skipped by the regular expression.
+    for match in spec.bracket_pattern.finditer(string):
+        index = match.start()
+        character = match.group()
         # If an opening bracket is met, then it is stacked.
-        if character in opening_brackets:
+        if character in closing_brackets_dict:
             bracket_index_stack.append(index)
             bracket_stack.append(character)
         # If a closing bracket is met, then an element of the stack must be popped.
         # If no other elements exist, then the syntax is wrong since there is a closing bracket
         # without its opening counterpart.
-        elif character in closing_brackets:
+        else:
             if bracket_stack:
                 popped_bracket = bracket_stack.pop()
                 bracket_index_stack.pop()
@@ -133,14 +326,14 @@ def fix_brackets_syntax(string):
                     # Calling the backtracking function to find which points the opening counterpart can
                     # be added, and finding possible correct syntaxes.
                     return backtrack_missing_open_bracket(
-                        index, bracket_stack, opening_brackets_dict[character], string
+                        index, bracket_stack, opening_brackets_dict[character], string, spec
                     )
 
             else:
                 # If the stack is empty when a closing bracket is found, then an opening counterpart must
                 # be added. Calling the backtracking function to find where that can be added.
                 return backtrack_missing_open_bracket(
-                    index, bracket_stack, opening_brackets_dict[character], string
+                    index, bracket_stack, opening_brackets_dict[character], string, spec
                 )
 
     # If the bracket stack is not completely empty after looking at all characters, then an
@@ -152,18 +345,71 @@ def fix_brackets_syntax(string):
         if bracket_stack and bracket_index_stack:
             lone_bracket_index = bracket_index_stack.pop()
             possible_syntaxes += get_possible_closing_placements(
-                lone_bracket_index, string
+                lone_bracket_index, string, spec
             )
         return possible_syntaxes
     return [string]
 
 
-def fix_multiple_syntax_errors(string):
+def get_max_stack_depth(string, spec=None):
+    """Function that gives the largest number of unclosed brackets found while analyzing a string,
+    which is the largest size of the stack of the analysis.
+
+    Args:
+        string (string): A string containing brackets and other characters.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        integer: the largest size of the stack.
+    """
+    spec = get_bracket_spec(spec)
+    closing_brackets_dict = spec.closing_brackets_dict
+    depth = 0
+    max_depth = 0
+    for match in spec.bracket_pattern.finditer(string):
+        if match.group() in closing_brackets_dict:
+            depth += 1
+            max_depth = max(max_depth, depth)
+        elif depth:
+            depth -= 1
+    return max_depth
+
+
+def run_measured_round(stats, possible_syntaxes, spec=None):
+    """Function that runs a round of fix_multiple_syntax_errors, recording its time, the number of
+    candidates it generated, how many of them were duplicates and the largest stack it analyzed.
+
+    Args:
+        stats (PassStats): stats where the round is recorded.
+        possible_syntaxes (list of strings): the syntaxes to be fixed in the round.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        list of strings: the fixes of every syntax.
+    """
+    new_fixed_syntaxes = []
+    with stats.measure("fix_multiple_syntax_errors.round"):
+        for possible_syntax in possible_syntaxes:
+            new_fixed_syntaxes += fix_brackets_syntax(possible_syntax, spec)
+    stats.add("fix_multiple_syntax_errors.candidates", len(new_fixed_syntaxes))
+    stats.add(
+        "fix_multiple_syntax_errors.dedup_hits",
+        len(new_fixed_syntaxes) - len(set(new_fixed_syntaxes)),
+    )
+    for possible_syntax in possible_syntaxes:
+        stats.update_max(
+            "fix_multiple_syntax_errors.max_stack_depth", get_max_stack_depth(possible_syntax, spec)
+        )
+    return new_fixed_syntaxes
+
+
+def fix_multiple_syntax_errors(string, spec=None, stats=None):
     """Function that given a string, finds all bracket syntax errors it encounters and
     outputs every single possible fix for all errors.
 
     Args:
-        A string containing brackets and other characters.
+        string (string): A string containing brackets and other characters.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+        stats (PassStats): if given, the time of each round, the number of candidates generated,
+        the duplicates among them and the largest stack analyzed are recorded in it.
     Returns:
         list of strings: A list of corrected syntax brackets (only contains itself if
         it is already correct)
@@ -177,8 +423,11 @@ def fix_multiple_syntax_errors(string):
         keep_running = False
         # List that will be filled with all corrected syntax for a given iteration.
         new_fixed_syntaxes = []
-        for possible_syntax in possible_syntaxes:
-            new_fixed_syntaxes += fix_brackets_syntax(possible_syntax)
+        if stats is None:
+            for possible_syntax in possible_syntaxes:
+                new_fixed_syntaxes += fix_brackets_syntax(possible_syntax, spec)
+        else:
+            new_fixed_syntaxes = run_measured_round(stats, possible_syntaxes, spec)
         # If there are new fixed syntaxes, that means an error was encountered. If there are no
         # new fixed syntaxes, then no new error was encountered and no more iterations are needed.
         for new_fixed_syntax in new_fixed_syntaxes:
@@ -188,6 +437,214 @@ def fix_multiple_syntax_errors(string):
     return possible_syntaxes
 
 
-# Verify a given case.
-print("Original syntax: ", syntax_input)
-print("Possible fixes: ", fix_multiple_syntax_errors(syntax_input))
+def scan_brackets_syntax(string, start=0, stack=None, states=None, spec=None):
+    """Function that analyzes the syntax of a string from a given index, with the stack of unclosed
+    brackets found before it, so an analysis can be resumed where another one was.
+
+    Stacks are persistent: each element is a tuple of the bracket, its index, the size of the stack
+    and the stack below it, or None for an empty stack. Stacking a bracket does not change the
+    stack below, so the stack before each index can be saved without copying it.
+
+    Args:
+        string (string or EditedSyntax): A string containing brackets and other characters.
+        start (integer): index where the analysis starts.
+        stack (tuple): stack of unclosed brackets before the start index.
+        states (list): if given, the stack before each analyzed index is appended to it, and the
+        stack after the last character if there are no errors.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        error_index (integer): index of the closing bracket without its opening counterpart, or None.
+        stack (tuple): stack of unclosed brackets at the error, after popping a mismatched bracket,
+        or at the end of the string.
+    """
+    spec = get_bracket_spec(spec)
+    closing_brackets_dict = spec.closing_brackets_dict
+    closing_brackets = spec.closing_brackets
+    for index, character in enumerate(iter_characters(string, start), start):
+        if states is not None:
+            states.append(stack)
+        # If an opening bracket is met, then it is stacked.
+        if character in closing_brackets_dict:
+            stack = (character, index, 1 if stack is None else stack[2] + 1, stack)
+        # If a closing bracket is met, then an element of the stack must be popped.
+        elif character in closing_brackets:
+            if stack is None:
+                return index, stack
+            popped_bracket, _, _, stack = stack
+            # If the popped bracket is different than its closing counterpart, the syntax is wrong.
+            if character != closing_brackets_dict[popped_bracket]:
+                return index, stack
+    if states is not None:
+        states.append(stack)
+    return None, stack
+
+
+def get_scan_state(candidate, index):
+    """Gives the stack of unclosed brackets before an index of a candidate, from its own states or
+    from the states of its ancestors, which share the string up to the index."""
+    while index < candidate.start:
+        candidate = candidate.parent
+    return candidate.states[index - candidate.start]
+
+
+def get_missing_opening_positions(error_index, stack_size, string, spec=None):
+    """Function that gives the indexes where an opening bracket can be inserted to fix a closing
+    bracket without its opening counterpart, as backtrack_missing_open_bracket.
+
+    Args:
+        error_index (int): index where the syntax error was found
+        stack_size (int): size of the stack of syntax analysis when the error was found
+        string (string or EditedSyntax): contains the syntax to be fixed.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        list of integers: indexes where the opening bracket can be inserted.
+    """
+    spec = get_bracket_spec(spec)
+    opening_brackets = spec.opening_brackets
+    closing_brackets = spec.closing_brackets
+    positions = [error_index]
+    backtrack_size = stack_size
+    for i, character in enumerate(iter_reversed_characters(string, error_index)):
+        # Reverse logic from the analysis: if it is a opening bracket, it must pop.
+        if character in opening_brackets:
+            if backtrack_size:
+                backtrack_size -= 1
+            else:
+                break
+        # Reverse logic: if there is a closing bracket, it must append its opening counterpart.
+        elif character in closing_brackets:
+            backtrack_size += 1
+        if backtrack_size < stack_size:
+            break
+        elif backtrack_size == stack_size:
+            positions.append(error_index - 1 - i)
+    return positions
+
+
+def get_closing_positions(lone_i, string, spec=None):
+    """Function that gives the indexes where a closing bracket can be inserted to fix a lone open
+    bracket, as get_possible_closing_placements.
+
+    Args:
+        lone_i (integer): The index of the lone open bracket on the string.
+        string (string or EditedSyntax): The syntax to be fixed.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        list of integers: indexes where the closing bracket can be inserted.
+    """
+    spec = get_bracket_spec(spec)
+    opening_brackets = spec.opening_brackets
+    closing_brackets = spec.closing_brackets
+    stack_size = 0
+    positions = [lone_i + 1]
+    for i, character in enumerate(iter_characters(string, lone_i + 1), lone_i + 1):
+        if character in closing_brackets:
+            if stack_size:
+                stack_size -= 1
+            else:
+                break
+        elif character in opening_brackets:
+            stack_size += 1
+        # If the stack is empty, the placement after the character is valid.
+        if not stack_size:
+            positions.append(i + 1)
+    return positions
+
+
+def iter_fixed_candidates(string, max_results=None, time_budget=None, spec=None, stats=None):
+    """Generator that, given a string, fixes all bracket syntax errors it encounters, as
+    fix_multiple_syntax_errors, but gives each corrected syntax once, as soon as it is found.
+
+    Candidates are explored depth first, so corrected syntaxes are found before every candidate of
+    a round is built, and candidates that were already explored are skipped with a set. Each
+    candidate is the string of its parent with one inserted bracket, kept as an EditedSyntax, so
+    its analysis resumes from the state of its parent at the inserted bracket instead of starting
+    over, and no candidate string is built.
+
+    Args:
+        string (string): A string containing brackets and other characters.
+        max_results (integer): number of corrected syntaxes after which the search stops, or None.
+        time_budget (number): seconds after which the search stops, or None.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+        stats (PassStats): if given, the time of the analyses, the number of candidates analyzed,
+        the candidates skipped for being already explored and the largest stack are recorded in it.
+    Yields:
+        EditedSyntax: each unique corrected syntax (only the string itself if it is already
+        correct).
+    """
+    spec = get_bracket_spec(spec)
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    results = 0
+    root = EditedSyntax(string)
+    visited = {root}
+    # Stack of candidates to be analyzed, each with its parent, the index where its analysis starts
+    # and the stack of unclosed brackets before it.
+    candidates = [(root, None, 0, None)]
+    while candidates:
+        if max_results is not None and results >= max_results:
+            return
+        if deadline is not None and time.monotonic() >= deadline:
+            return
+        edited_syntax, parent, start, stack = candidates.pop()
+        candidate = SyntaxCandidate(edited_syntax, parent, start, [])
+        if stats is None:
+            error_index, stack = scan_brackets_syntax(
+                edited_syntax, start, stack, candidate.states, spec
+            )
+        else:
+            with stats.measure("scan_brackets_syntax"):
+                error_index, stack = scan_brackets_syntax(
+                    edited_syntax, start, stack, candidate.states, spec
+                )
+            stats.add("iter_fixed_candidates.candidates")
+            stats.update_max(
+                "iter_fixed_candidates.max_stack_depth",
+                max((state[2] for state in candidate.states if state is not None), default=0),
+            )
+        if error_index is not None:
+            # A closing bracket without its opening counterpart must have one inserted before it.
+            bracket_to_insert = spec.opening_brackets_dict[edited_syntax[error_index]]
+            positions = get_missing_opening_positions(
+                error_index, 0 if stack is None else stack[2], edited_syntax, spec
+            )
+        elif stack is not None:
+            # The last unclosed opening bracket must have its closing counterpart inserted after it.
+            bracket_to_insert = spec.closing_brackets_dict[stack[0]]
+            positions = get_closing_positions(stack[1], edited_syntax, spec)
+        else:
+            results += 1
+            yield edited_syntax
+            continue
+        # Fixes are stacked in reverse so they are analyzed in the order they were found.
+        for position in reversed(positions):
+            fixed_syntax = edited_syntax.insert(position, bracket_to_insert)
+            if fixed_syntax not in visited:
+                visited.add(fixed_syntax)
+                candidates.append(
+                    (fixed_syntax, candidate, position, get_scan_state(candidate, position))
+                )
+            elif stats is not None:
+                stats.add("iter_fixed_candidates.dedup_hits")
+
+
+def iter_fixed_syntaxes(string, max_results=None, time_budget=None, spec=None, stats=None):
+    """Generator that gives each unique corrected syntax of iter_fixed_candidates as a string.
+
+    Args:
+        string (string): A string containing brackets and other characters.
+        max_results (integer): number of corrected syntaxes after which the search stops, or None.
+        time_budget (number): seconds after which the search stops, or None.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+        stats (PassStats): if given, the search is recorded in it, as in iter_fixed_candidates.
+    Yields:
+        string: each unique corrected syntax (only the string itself if it is already correct).
+    """
+    for edited_syntax in iter_fixed_candidates(string, max_results, time_budget, spec, stats):
+        yield str(edited_syntax)
+
+
+if __name__ == "__main__":
+    # Verify a given case.
+    print("Original syntax: ", syntax_input)
+    print("Possible fixes: ", fix_multiple_syntax_errors(syntax_input))
+    print("Unique fixes: ", list(iter_fixed_syntaxes(syntax_input)))
@@ -0,0 +1,374 @@
+"""Benchmarks of the bracket syntax checkers and repairs of question 2.
+
+Each solution is run on synthetic texts of several shapes, from bytes to gigabytes, measuring the
+throughput, the peak memory and, for repairs, the number of candidates analyzed per second. Texts
+can have errors made by deleting random brackets, which the repairs must fix. Results are saved as
+JSON, and can be compared with the results of a previous run.
+
+Usage:
+    python q2_benchmark.py --sizes 1K 1M 100M --output results.json
+    python q2_benchmark.py --sizes 16 64 256 --errors 1 3 --output repairs.json
+    python q2_benchmark.py --output new.json --compare results.json
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import q2_a
+import q2_b1
+import q2_parallel
+from instrumentation import PassStats
+from q2_b4 import fix_multiple_syntax_errors, iter_fixed_syntaxes
+from q2_numpy import find_brackets_error_numpy
+from q2_repair import repair_brackets
+from q2_spec import BracketSpec, get_bracket_spec
+from q2_stream import CHUNK_SIZE, StreamingBracketValidator
+
+# Texts are built by repeating random blocks of this size, so that large texts are built quickly.
+BLOCK_SIZE = 1 << 16
+# Largest sizes run with each repair, whose time grows quickly with the size of the text.
+MAX_REFERENCE_REPAIR_SIZE = 32
+MAX_FIXES_SIZE = 100_000
+MAX_REPAIR_SIZE = 128
+# Number of corrected syntaxes and seconds after which the lazy search for fixes is stopped, as
+# deeply nested texts with a few errors have too many fixes to be searched.
+MAX_FIXES = 1_000
+FIXES_TIME_BUDGET = 1.0
+# Suffixes of the sizes given in the command line.
+SIZE_SUFFIXES = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+def generate_random_balanced(size, generator, spec):
+    """Random brackets with a correct syntax, as a random walk of the number of unclosed brackets."""
+    size -= size % 2
+    openings = [opening for opening, _ in spec.pairs]
+    characters = []
+    stack = []
+    for index in range(size):
+        remaining = size - index
+        if stack and (len(stack) >= remaining or generator.random() < 0.5):
+            characters.append(spec.closing_brackets_dict[stack.pop()])
+        else:
+            stack.append(generator.choice(openings))
+            characters.append(stack[-1])
+    return "".join(characters)
+
+
+def generate_text_block(size, generator, spec):
+    """Words with a bracket pair around a word every hundred characters or so."""
+    pieces = []
+    length = 0
+    while length < size:
+        if size - length > 12 and generator.random() < 0.1:
+            opening, closing = generator.choice(spec.pairs)
+            piece = opening + "x" * generator.randint(1, 8) + closing
+        else:
+            piece = "lorem ipsum "[: min(12, size - length)]
+        pieces.append(piece)
+        length += len(piece)
+    return "".join(pieces)
+
+
+def repeat_blocks(block_function, size, seed, spec):
+    """Builds a text of a given size from random blocks with a correct syntax, repeating a block
+    for large sizes, which keeps the syntax correct."""
+    generator = random.Random(seed)
+    if size <= BLOCK_SIZE:
+        return block_function(size, generator, spec)
+    block = block_function(BLOCK_SIZE, generator, spec)
+    return block * (size // BLOCK_SIZE) + block_function(size % BLOCK_SIZE, generator, spec)
+
+
+def generate_deep_nesting(size, seed=0, spec=None):
+    """All opening brackets followed by all closing brackets, the largest possible stack."""
+    spec = get_bracket_spec(spec)
+    openings = "".join(opening for opening, _ in spec.pairs)
+    half = size // 2
+    opening_part = (openings * (half // len(openings) + 1))[:half]
+    return opening_part + opening_part[::-1].translate(spec.closing_table)
+
+
+def generate_flat_runs(size, seed=0, spec=None):
+    """Pairs of brackets that close right away, the largest number of stack operations."""
+    spec = get_bracket_spec(spec)
+    pairs = "".join(spec.pairs)
+    size -= size % 2
+    return (pairs * (size // len(pairs) + 1))[:size]
+
+
+def generate_mostly_text(size, seed=0, spec=None):
+    """Text that is mostly not brackets, such as prose or source code."""
+    return repeat_blocks(generate_text_block, size, seed, get_bracket_spec(spec))
+
+
+def generate_random_nesting(size, seed=0, spec=None):
+    """Random brackets with a correct syntax."""
+    return repeat_blocks(generate_random_balanced, size, seed, get_bracket_spec(spec))
+
+
+GENERATORS = {
+    "deep_nesting": generate_deep_nesting,
+    "flat_runs": generate_flat_runs,
+    "mostly_text": generate_mostly_text,
+    "random_nesting": generate_random_nesting,
+}
+
+
+def add_errors(text, errors, seed=0, spec=None):
+    """Deletes random brackets of a text, which makes a syntax error for each deletion.
+
+    Args:
+        text (string): text with a correct syntax.
+        errors (integer): number of brackets deleted.
+        seed (integer): seed of the choice of the brackets.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        string: the text without the deleted brackets.
+    """
+    spec = get_bracket_spec(spec)
+    generator = random.Random(seed)
+    for _ in range(errors):
+        brackets = spec.bracket_pattern.search(text, generator.randrange(len(text) + 1))
+        if brackets is None:
+            brackets = spec.bracket_pattern.search(text)
+        if brackets is None:
+            break
+        text = text[: brackets.start()] + text[brackets.end() :]
+    return text
+
+
+def validate_streaming(text, spec):
+    """Validates a text fed to the streaming validator one chunk at a time."""
+    validator = StreamingBracketValidator(spec)
+    for start in range(0, len(text), CHUNK_SIZE):
+        if not validator.feed(text[start : start + CHUNK_SIZE]):
+            break
+    return validator.finish()
+
+
+def get_cases(spec):
+    """Gives the functions to be measured for an alphabet of brackets.
+
+    Args:
+        spec (BracketSpec): the alphabet of brackets.
+    Returns:
+        list of tuples: name of each case, function, largest size it is run with or None, and the
+        counter of candidates it records in a PassStats or None. Functions take the text and
+        the stats, which may be None.
+    """
+    cases = [
+        (
+            "q2_b1.is_brackets_syntax_correct",
+            lambda text, stats: q2_b1.is_brackets_syntax_correct(text, spec),
+            None,
+            None,
+        ),
+        (
+            "q2_parallel.find_brackets_error_parallel",
+            lambda text, stats: q2_parallel.find_brackets_error_parallel(text, spec=spec),
+            None,
+            None,
+        ),
+        (
+            "q2_stream.StreamingBracketValidator",
+            lambda text, stats: validate_streaming(text, spec),
+            None,
+            None,
+        ),
+        (
+            "q2_b4.fix_multiple_syntax_errors",
+            lambda text, stats: fix_multiple_syntax_errors(text, spec, stats),
+            MAX_REFERENCE_REPAIR_SIZE,
+            "fix_multiple_syntax_errors.candidates",
+        ),
+        (
+            "q2_b4.iter_fixed_syntaxes",
+            lambda text, stats: sum(
+                1 for _ in iter_fixed_syntaxes(text, MAX_FIXES, FIXES_TIME_BUDGET, spec, stats)
+            ),
+            MAX_FIXES_SIZE,
+            "iter_fixed_candidates.candidates",
+        ),
+        (
+            "q2_repair.repair_brackets",
+            lambda text, stats: repair_brackets(text, spec),
+            MAX_REPAIR_SIZE,
+            None,
+        ),
+    ]
+    # The first solution and the vectorized one only handle a single type of bracket.
+    if len(spec.pairs) == 1:
+        opening, closing = spec.pairs[0]
+        cases.append(
+            (
+                "q2_numpy.find_brackets_error_numpy",
+                lambda text, stats: find_brackets_error_numpy(text, opening, closing),
+                None,
+                None,
+            )
+        )
+        if spec.pairs == ("()",):
+            cases.append(
+                (
+                    "q2_a.is_brackets_syntax_correct",
+                    lambda text, stats: q2_a.is_brackets_syntax_correct(text),
+                    None,
+                    None,
+                )
+            )
+    return cases
+
+
+def measure(function, text, repeat, candidates_counter=None, trace_memory=True):
+    """Measures a function call.
+
+    Args:
+        function (function): the function to be measured, given the text and the stats.
+        text (string): the text given to the function.
+        repeat (integer): number of timed calls, of which the fastest is kept.
+        candidates_counter (string): counter of the candidates analyzed by the function, or None.
+        trace_memory (boolean): whether the peak memory is measured.
+    Returns:
+        dictionary: best time in seconds, throughput in MB/s and, if measured, the peak memory in
+        bytes and the number of candidates analyzed per second.
+    """
+    best_time = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text, None)
+        best_time = min(best_time, time.perf_counter() - start)
+    result = {
+        "seconds": best_time,
+        "mb_per_second": len(text) / best_time / 1e6 if best_time > 0 else math.inf,
+    }
+
+    # Candidates and memory are measured on separate calls, since both make the calls slower.
+    if candidates_counter is not None:
+        stats = PassStats()
+        function(text, stats)
+        result["candidates"] = stats.counters.get(candidates_counter, 0)
+        result["candidates_per_second"] = result["candidates"] / best_time if best_time > 0 else 0
+    if trace_memory:
+        tracemalloc.start()
+        function(text, None)
+        _, result["peak_bytes"] = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result
+
+
+def run_benchmarks(sizes, shapes, errors_list, repeat, spec, trace_memory=True):
+    """Runs every case for every shape, size and number of errors.
+
+    Args:
+        sizes (list of integers): number of characters of the texts.
+        shapes (list of strings): names of the text generators.
+        errors_list (list of integers): numbers of brackets deleted from the texts.
+        repeat (integer): number of timed calls of each case.
+        spec (BracketSpec): the alphabet of brackets.
+        trace_memory (boolean): whether the peak memory is measured.
+    Returns:
+        list of dictionaries: one result per case, shape, size and number of errors.
+    """
+    results = []
+    cases = get_cases(spec)
+    for shape in shapes:
+        for size in sizes:
+            correct_text = GENERATORS[shape](size, 0, spec)
+            for errors in errors_list:
+                text = add_errors(correct_text, errors, 0, spec)
+                for name, function, max_size, candidates_counter in cases:
+                    result = {"case": name, "shape": shape, "size": len(text), "errors": errors}
+                    if max_size is not None and len(text) > max_size:
+                        result["skipped"] = True
+                    else:
+                        result.update(
+                            measure(function, text, repeat, candidates_counter, trace_memory)
+                        )
+                    results.append(result)
+                    print(format_result(result), file=sys.stderr)
+                del text
+            del correct_text
+    return results
+
+
+def format_result(result, previous=None):
+    """Formats a result as a line of text, with the ratio to a previous result if given."""
+    line = (
+        f"{result['case']:<42} {result['shape']:<15} {result['size']:>11}"
+        f" {result['errors']:>3} errors"
+    )
+    if result.get("skipped"):
+        return line + "  skipped"
+    line += f"  {result['mb_per_second']:>10.2f} MB/s"
+    if "candidates_per_second" in result:
+        line += f"  {result['candidates_per_second']:>10.0f} candidates/s"
+    if "peak_bytes" in result:
+        line += f"  {result['peak_bytes']:>12} B peak"
+    if previous is not None and not previous.get("skipped"):
+        line += f"  x{result['seconds'] / previous['seconds']:.2f} time"
+    return line
+
+
+def compare_results(results, previous_results):
+    """Prints each result next to the result of the same case in a previous run."""
+    previous = {
+        (result["case"], result["shape"], result["size"], result["errors"]): result
+        for result in previous_results
+    }
+    for result in results:
+        key = (result["case"], result["shape"], result["size"], result["errors"])
+        print(format_result(result, previous.get(key)))
+
+
+def parse_size(text):
+    """Reads a size from the command line, such as 100, 64K, 16M or 1G."""
+    suffix = text[-1:].upper()
+    if suffix in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[suffix])
+    return int(text)
+
+
+def main(arguments=None):
+    """Command line interface of the benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmarks of bracket syntax checking.")
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=[16, 256, 64 << 10, 16 << 20])
+    parser.add_argument("--shapes", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument("--errors", type=int, nargs="+", default=[0, 2])
+    parser.add_argument("--pairs", nargs="+", default=["()", "{}", "[]"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip measuring peak memory")
+    parser.add_argument("--output", help="path of the JSON file for the results")
+    parser.add_argument("--compare", help="path of the JSON file of a previous run")
+    arguments = parser.parse_args(arguments)
+
+    spec = BracketSpec(*arguments.pairs)
+    results = run_benchmarks(
+        arguments.sizes,
+        arguments.shapes,
+        arguments.errors,
+        arguments.repeat,
+        spec,
+        not arguments.no_memory,
+    )
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "pairs": list(spec.pairs),
+        "results": results,
+    }
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            compare_results(results, json.load(file)["results"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Differential fuzzer of the bracket syntax checkers and repairs of question 2.
+
+Random texts are given to the first solutions, which are the reference, and to every faster
+solution, which must agree with them exactly:
+    - Validation: q2_a (for round brackets) and q2_b1 against the chunk summaries of q2_parallel
+      merged over random splits, both all at once and two at a time, the streaming validator fed random chunks, and the vectorized
+      solutions of q2_numpy (for a single type of bracket).
+    - Fixes: q2_b4.fix_multiple_syntax_errors against the lazy search of iter_fixed_syntaxes, which
+      must give each of its fixes exactly once.
+    - Minimum repairs: q2_repair against a search of every insertion for short texts.
+The first disagreement found is printed with its text, which can be given back to the solutions.
+
+Usage:
+    python q2_fuzz.py --iterations 10000 --seed 1
+    python q2_fuzz.py --pairs "()" --max-length 200
+"""
+import argparse
+import random
+import sys
+from functools import reduce
+from itertools import product
+
+import q2_a
+import q2_b1
+from q2_b4 import fix_multiple_syntax_errors, iter_fixed_syntaxes
+from q2_numpy import find_brackets_error_numpy, find_brackets_errors_batch, pack_strings
+from q2_parallel import (
+    get_chunk_summary,
+    get_summary_error,
+    merge_all_summaries,
+    merge_summaries,
+)
+from q2_repair import count_optimal_repairs, get_minimum_insertions, repair_brackets
+from q2_spec import BracketSpec
+from q2_stream import StreamingBracketValidator
+
+# Characters that are not brackets, including one outside of ASCII.
+OTHER_CHARACTERS = "ab é"
+# Longest texts given to the reference fixes and to the search of every insertion, whose time
+# grows exponentially with the length of the text.
+MAX_REFERENCE_FIXES_LENGTH = 10
+MAX_INSERTIONS_LENGTH = 6
+# Largest number of insertions of the search of every insertion.
+MAX_SEARCHED_INSERTIONS = 3
+
+
+class Mismatch(AssertionError):
+    """Error raised when a solution does not agree with the reference."""
+
+    def __init__(self, message, text):
+        super().__init__(f"{message} for {text!r}")
+        self.text = text
+
+
+def check(condition, message, text):
+    """Raises a Mismatch if a condition does not hold."""
+    if not condition:
+        raise Mismatch(message, text)
+
+
+def generate_text(generator, max_length, spec):
+    """Random text with brackets and other characters, more often with correct syntax or few
+    errors, since random brackets almost always fail at the start."""
+    length = generator.randint(0, max_length)
+    brackets = "".join(spec.pairs)
+    if generator.random() < 0.5:
+        characters = brackets + OTHER_CHARACTERS
+        return "".join(generator.choice(characters) for _ in range(length))
+    # Random walk with a correct syntax, where some brackets are deleted or replaced.
+    stack = []
+    characters = []
+    for index in range(length):
+        if stack and (len(stack) >= length - index or generator.random() < 0.5):
+            characters.append(spec.closing_brackets_dict[stack.pop()])
+        elif generator.random() < 0.2:
+            characters.append(generator.choice(OTHER_CHARACTERS))
+        else:
+            stack.append(generator.choice(spec.pairs)[0])
+            characters.append(stack[-1])
+    for _ in range(generator.randint(0, 2)):
+        if characters:
+            index = generator.randrange(len(characters))
+            if generator.random() < 0.5:
+                del characters[index]
+            else:
+                characters[index] = generator.choice(brackets)
+    return "".join(characters)
+
+
+def get_random_cuts(generator, length):
+    """Random offsets splitting a text of a given length into chunks, including empty chunks."""
+    cuts = sorted(generator.randint(0, length) for _ in range(generator.randint(0, 4)))
+    return [0] + cuts + [length]
+
+
+def find_error_by_summaries(text, cuts, spec):
+    """Finds the first error of a text by merging the summaries of its chunks, as q2_parallel does
+    with the summaries given by its workers, checking that merging them two at a time gives the
+    same summary."""
+    summaries = [
+        get_chunk_summary(text[start:stop], start, spec) for start, stop in zip(cuts, cuts[1:])
+    ]
+    summary = merge_all_summaries(summaries, spec)
+    pairwise_summary = reduce(lambda left, right: merge_summaries(left, right, spec), summaries)
+    check(summary == pairwise_summary, "q2_parallel merge_all_summaries", text)
+    return get_summary_error(summary, len(text))
+
+
+def find_error_by_stream(chunks, spec):
+    """Finds the first error of a text fed to the streaming validator in chunks."""
+    validator = StreamingBracketValidator(spec)
+    for chunk in chunks:
+        validator.feed(chunk)
+    return validator.finish()
+
+
+def check_validation(text, generator, spec):
+    """Compares every validation of a text with the reference.
+
+    Args:
+        text (string): the text.
+        generator (Random): source of the random chunks.
+        spec (BracketSpec): the alphabet of brackets.
+    Returns:
+        integer: offset of the first error, or None if the syntax is correct.
+    """
+    correct = q2_b1.is_brackets_syntax_correct(text, spec)
+    check(correct == q2_b1.is_brackets_syntax_correct(text.encode(), spec), "q2_b1 bytes", text)
+    if spec.pairs == ("()",):
+        check(correct == q2_a.is_brackets_syntax_correct(text), "q2_a", text)
+
+    cuts = get_random_cuts(generator, len(text))
+    error = find_error_by_summaries(text, cuts, spec)
+    check((error is None) == correct, "q2_parallel summaries", text)
+    chunks = [text[start:stop] for start, stop in zip(cuts, cuts[1:])]
+    check(find_error_by_stream(chunks, spec) == error, "q2_stream and q2_parallel offsets", text)
+    # Offsets of bytes are the same as the offsets of characters up to the first non ASCII one.
+    encoded = text.encode()
+    byte_cuts = get_random_cuts(generator, len(encoded))
+    byte_chunks = [encoded[start:stop] for start, stop in zip(byte_cuts, byte_cuts[1:])]
+    byte_error = find_error_by_stream(byte_chunks, spec)
+    check((byte_error is None) == correct, "q2_stream bytes", text)
+    if text.isascii():
+        check(byte_error == error, "q2_stream bytes offset", text)
+
+    if len(spec.pairs) == 1:
+        opening, closing = spec.pairs[0]
+        numpy_error = find_brackets_error_numpy(text, opening, closing)
+        check((numpy_error is None) == correct, "q2_numpy", text)
+        if text.isascii():
+            check(numpy_error == error, "q2_numpy offset", text)
+    return error
+
+
+def check_batch_validation(texts, errors, spec):
+    """Compares the errors of the vectorized batch validation with the errors of each text."""
+    if len(spec.pairs) != 1 or not all(text.isascii() for text in texts):
+        return
+    opening, closing = spec.pairs[0]
+    buffer, offsets = pack_strings(texts)
+    batch_errors = find_brackets_errors_batch(buffer, offsets, opening, closing).tolist()
+    for text, error, batch_error in zip(texts, errors, batch_errors):
+        check(batch_error == (-1 if error is None else error), "q2_numpy batch", text)
+
+
+def check_fixes(text, spec):
+    """Compares the lazy search for fixes with the reference fixes of a text."""
+    if len(text) > MAX_REFERENCE_FIXES_LENGTH:
+        return
+    reference_fixes = fix_multiple_syntax_errors(text, spec)
+    fixes = list(iter_fixed_syntaxes(text, spec=spec))
+    check(len(fixes) == len(set(fixes)), "iter_fixed_syntaxes duplicates", text)
+    check(set(fixes) == set(reference_fixes), "iter_fixed_syntaxes", text)
+
+
+def search_insertions(text, spec):
+    """Finds every correction of a text with the fewest insertions, by trying every insertion.
+
+    Args:
+        text (string): the text.
+        spec (BracketSpec): the alphabet of brackets.
+    Returns:
+        minimum (integer): fewest insertions, or None if more than MAX_SEARCHED_INSERTIONS.
+        corrections (set of strings): corrections with that many insertions.
+    """
+    brackets = "".join(spec.pairs)
+    level = {text}
+    for insertions in range(MAX_SEARCHED_INSERTIONS + 1):
+        corrections = {
+            candidate for candidate in level if q2_b1.is_brackets_syntax_correct(candidate, spec)
+        }
+        if corrections:
+            return insertions, corrections
+        level = {
+            candidate[:index] + bracket + candidate[index:]
+            for candidate in level
+            for index, bracket in product(range(len(candidate) + 1), brackets)
+        }
+    return None, set()
+
+
+def check_repair(text, spec):
+    """Compares the minimum repair of a text with the reference validation and, for short texts,
+    with the search of every insertion."""
+    repair = repair_brackets(text, spec)
+    check(q2_b1.is_brackets_syntax_correct(repair, spec), "q2_repair result syntax", text)
+    minimum = get_minimum_insertions(text, spec)
+    check(len(repair) - len(text) == minimum, "q2_repair insertions", text)
+    if len(text) > MAX_INSERTIONS_LENGTH:
+        return
+    searched_minimum, corrections = search_insertions(text, spec)
+    if searched_minimum is None:
+        check(minimum > MAX_SEARCHED_INSERTIONS, "q2_repair minimum", text)
+        return
+    check(minimum == searched_minimum, "q2_repair minimum", text)
+    check(count_optimal_repairs(text, spec) == len(corrections), "q2_repair count", text)
+    check(repair in corrections, "q2_repair result", text)
+
+
+def run_fuzzer(iterations, seed, max_length, spec, batch_size=16):
+    """Runs the fuzzer.
+
+    Args:
+        iterations (integer): number of random texts.
+        seed (integer): seed of the random texts.
+        max_length (integer): longest random text.
+        spec (BracketSpec): the alphabet of brackets.
+        batch_size (integer): number of texts validated together by the batch validation.
+    Returns:
+        Mismatch: the first disagreement found, or None.
+    """
+    generator = random.Random(seed)
+    texts = []
+    errors = []
+    try:
+        for iteration in range(iterations):
+            text = generate_text(generator, max_length, spec)
+            texts.append(text)
+            errors.append(check_validation(text, generator, spec))
+            if len(texts) == batch_size:
+                check_batch_validation(texts, errors, spec)
+                texts = []
+                errors = []
+            check_fixes(text, spec)
+            if len(text) <= MAX_INSERTIONS_LENGTH or generator.random() < 0.1:
+                check_repair(text, spec)
+        check_batch_validation(texts, errors, spec)
+    except Mismatch as mismatch:
+        return mismatch
+    return None
+
+
+def main(arguments=None):
+    """Command line interface of the fuzzer."""
+    parser = argparse.ArgumentParser(description="Differential fuzzer of bracket syntax checking.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-length", type=int, default=40)
+    parser.add_argument("--pairs", nargs="+", default=["()", "{}", "[]"])
+    arguments = parser.parse_args(arguments)
+
+    spec = BracketSpec(*arguments.pairs)
+    mismatch = run_fuzzer(arguments.iterations, arguments.seed, arguments.max_length, spec)
+    if mismatch is not None:
+        print(f"Mismatch: {mismatch}")
+        sys.exit(1)
+    print(f"No mismatches in {arguments.iterations} texts.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import numpy as np
+
+# Definition of the strings to be analyzed, packed as a single byte buffer plus the offsets where
+# each string starts. String i is buffer[offsets[i]:offsets[i + 1]].
+strings = ["(((()(()())))()", "(()())", "())(", "", "(a(b)c)"]
+
+
+def get_steps_table(opening="(", closing=")"):
+    """Creates the lookup table of how much each byte changes the number of unclosed brackets.
+
+    Args:
+        opening (char): the opening bracket, a single byte character.
+        closing (char): the closing bracket, a single byte character.
+    Returns:
+        ndarray: int8 array of 256 elements, 1 for the opening bracket, -1 for the closing bracket
+        and 0 for every other byte.
+    """
+    table = np.zeros(256, dtype=np.int8)
+    table[ord(opening)] = 1
+    table[ord(closing)] = -1
+    return table
+
+
+def as_bytes_buffer(data):
+    """Converts a string or a bytes-like object to an array of bytes, without copying bytes.
+
+    Strings are encoded as UTF-8, so offsets are in bytes, which are the same as characters for
+    ASCII strings.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def get_depths(buffer, table):
+    """Gives the number of unclosed brackets after each byte of a buffer, as its prefix sum.
+
+    Args:
+        buffer (ndarray): array of bytes.
+        table (ndarray): lookup table from get_steps_table.
+    Returns:
+        ndarray: number of unclosed brackets after each byte, with 32 bit integers if they fit.
+    """
+    dtype = np.int32 if len(buffer) < 2**31 else np.int64
+    return np.cumsum(table[buffer], dtype=dtype)
+
+
+def find_brackets_error_numpy(data, opening="(", closing=")"):
+    """Finds the first syntax error of a string with a single type of bracket. The syntax is
+    correct if the number of unclosed brackets is never negative and ends at zero.
+
+    Args:
+        data (string or bytes-like): text containing brackets and other characters.
+        opening (char): the opening bracket.
+        closing (char): the closing bracket.
+    Returns:
+        integer: offset of the first closing bracket without its opening counterpart, the length of
+        the text if only opening brackets are left unclosed, or None if the syntax is correct.
+    """
+    buffer = as_bytes_buffer(data)
+    if len(buffer) == 0:
+        return None
+    depths = get_depths(buffer, get_steps_table(opening, closing))
+    if depths.min() < 0:
+        return int(np.argmax(depths < 0))
+    if depths[-1] != 0:
+        return len(buffer)
+    return None
+
+
+def is_brackets_syntax_correct_numpy(data, opening="(", closing=")"):
+    """Function that verifies if a string of brackets has a correct or incorrect syntax.
+
+    Args:
+        A string or bytes-like object containing brackets of a single type and other characters.
+    Returns:
+        boolean: True if the syntax is correct and False if it is incorrect.
+    """
+    return find_brackets_error_numpy(data, opening, closing) is None
+
+
+def pack_strings(strings):
+    """Packs a collection of strings into a single byte buffer and its offsets.
+
+    Args:
+        strings (A list of strings or bytes): strings to be packed.
+    Returns:
+        buffer (ndarray): bytes of all strings, encoded as UTF-8.
+        offsets (ndarray): int64 array of S + 1 indexes of where each string starts.
+    """
+    encoded = [string.encode() if isinstance(string, str) else string for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(string) for string in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def find_brackets_errors_batch(buffer, offsets, opening="(", closing=")"):
+    """Finds the first syntax error of every string of a buffer, with a single type of bracket.
+
+    The prefix sum is computed once for the whole buffer, and the sum before each string is
+    subtracted from its bytes, which gives the number of unclosed brackets inside each string.
+
+    Args:
+        buffer (bytes-like or ndarray): bytes of all strings.
+        offsets (array-like): S + 1 increasing indexes of where each string starts, ending at the
+        size of the buffer.
+        opening (char): the opening bracket.
+        closing (char): the closing bracket.
+    Returns:
+        ndarray: int64 array of S elements, the offset of the first error inside each string, the
+        length of the string if only opening brackets are left unclosed, or -1 if the syntax is
+        correct.
+    """
+    buffer = as_bytes_buffer(buffer) if not isinstance(buffer, np.ndarray) else buffer
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if offsets.ndim != 1 or len(offsets) == 0 or offsets[0] != 0:
+        raise ValueError("Offsets must be a one dimensional array starting at 0.")
+    if offsets[-1] != len(buffer) or np.any(np.diff(offsets) < 0):
+        raise ValueError("Offsets must be increasing and end at the size of the buffer.")
+    lengths = np.diff(offsets)
+    errors = np.full(len(lengths), -1, dtype=np.int64)
+    if len(buffer) == 0:
+        return errors
+
+    depths = get_depths(buffer, get_steps_table(opening, closing))
+    # Number of unclosed brackets before each string, subtracted so each string starts at zero.
+    before = np.where(offsets[:-1] > 0, depths[np.maximum(offsets[:-1] - 1, 0)], 0)
+    depths -= np.repeat(before.astype(depths.dtype), lengths)
+
+    # Only non empty strings can have errors, and the ends of the others are not defined.
+    non_empty = lengths > 0
+    starts = offsets[:-1][non_empty]
+    # An unclosed opening bracket is an error at the end of the string.
+    unclosed = depths[offsets[1:][non_empty] - 1] != 0
+    non_empty_errors = np.where(unclosed, lengths[non_empty], -1)
+
+    # The first negative number of unclosed brackets of each string, found by searching the first
+    # negative position at or after the start of the string.
+    negatives = np.flatnonzero(depths < 0)
+    if len(negatives):
+        first = np.searchsorted(negatives, starts)
+        found = first < len(negatives)
+        first_negative = negatives[np.minimum(first, len(negatives) - 1)]
+        found &= first_negative < starts + lengths[non_empty]
+        non_empty_errors[found] = first_negative[found] - starts[found]
+    errors[non_empty] = non_empty_errors
+    return errors
+
+
+def are_brackets_syntax_correct_batch(buffer, offsets, opening="(", closing=")"):
+    """Evaluates, for every string of a buffer, if its brackets have a correct syntax.
+
+    Args:
+        buffer (bytes-like or ndarray): bytes of all strings.
+        offsets (array-like): S + 1 offsets of the strings.
+    Returns:
+        ndarray: boolean array of S elements, whether the syntax of each string is correct.
+    """
+    return find_brackets_errors_batch(buffer, offsets, opening, closing) < 0
+
+
+if __name__ == "__main__":
+    # Verify the given cases, one at a time and as a batch.
+    for string in strings:
+        print(repr(string), find_brackets_error_numpy(string))
+    print(find_brackets_errors_batch(*pack_strings(strings)))
@@ -0,0 +1,301 @@
+import mmap
+import os
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from q2_spec import get_bracket_spec
+
+# Summary of the brackets of a chunk of text. The closers are the closing brackets that have no
+# opening counterpart in the chunk, from the start of the chunk, and the openers are the opening
+# brackets that are not closed in the chunk, as in the stack of the sequential analysis. Each has
+# its brackets as a string and their offsets in the whole text. Error is the offset of the first
+# error found, or None.
+BracketSummary = namedtuple(
+    "BracketSummary", ["closers", "closer_offsets", "openers", "opener_offsets", "error"]
+)
+
+# Limits for the number of characters analyzed by each task. Tasks must be large enough that
+# their cost is not dominated by sending their summaries back.
+MIN_CHUNK_SIZE = 1 << 20
+MAX_CHUNK_SIZE = 1 << 26
+# Number of tasks given to each worker, so that workers that finish earlier can take more work.
+TASKS_PER_WORKER = 4
+
+
+def get_chunk_summary(string, start=0, spec=None):
+    """Analyzes the brackets of a chunk of text, as the sequential analysis but without failing
+    when a closing bracket has no opening counterpart, since it may be in a previous chunk.
+
+    Args:
+        string (string): the chunk, containing brackets and other characters.
+        start (integer): offset of the chunk in the whole text.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        BracketSummary: the summary of the chunk.
+    """
+    spec = get_bracket_spec(spec)
+    closing_brackets_dict = spec.closing_brackets_dict
+    closers = []
+    closer_offsets = array("q")
+    bracket_stack = []
+    offset_stack = array("q")
+    error = None
+    # Characters that are not brackets are skipped by the regular expression.
+    for match in spec.bracket_pattern.finditer(string):
+        character = match.group()
+        # If an opening bracket is met, then it is stacked.
+        if character in closing_brackets_dict:
+            bracket_stack.append(character)
+            offset_stack.append(start + match.start())
+        # If a closing bracket is met, then an element of the stack must be popped.
+        elif bracket_stack:
+            popped_bracket = bracket_stack.pop()
+            offset_stack.pop()
+            # If the popped bracket is different than its closing counterpart, the syntax is wrong,
+            # and nothing after it changes the first error.
+            if character != closing_brackets_dict[popped_bracket]:
+                error = start + match.start()
+                break
+        # If no other elements exist, its opening counterpart may be in a previous chunk.
+        else:
+            closers.append(character)
+            closer_offsets.append(start + match.start())
+    return BracketSummary(
+        "".join(closers), closer_offsets, "".join(bracket_stack), offset_stack, error
+    )
+
+
+def get_first_error(errors):
+    """Gives the smallest of the offsets of errors that are not None."""
+    errors = [error for error in errors if error is not None]
+    return min(errors) if errors else None
+
+
+def merge_summaries(left, right, spec=None):
+    """Merges the summaries of two consecutive chunks into the summary of both. The merge is
+    associative, so chunks can be merged in any grouping as long as their order is kept.
+
+    The closers of the right chunk close the openers of the left chunk, from the top of its stack.
+    Every error found is a point where the sequential analysis fails if no error comes before it,
+    so the first error of the whole text is the smallest of them.
+
+    Args:
+        left (BracketSummary): summary of the first chunk.
+        right (BracketSummary): summary of the chunk that follows it.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        BracketSummary: summary of both chunks.
+    """
+    spec = get_bracket_spec(spec)
+    matched = min(len(left.openers), len(right.closers))
+    errors = [left.error, right.error]
+    if matched:
+        # The closers expected by the top of the left stack, in the order they must come.
+        expected = left.openers[len(left.openers) - matched :][::-1].translate(spec.closing_table)
+        if expected != right.closers[:matched]:
+            for index in range(matched):
+                if expected[index] != right.closers[index]:
+                    errors.append(right.closer_offsets[index])
+                    break
+    return BracketSummary(
+        left.closers + right.closers[matched:],
+        left.closer_offsets + right.closer_offsets[matched:],
+        left.openers[: len(left.openers) - matched] + right.openers,
+        left.opener_offsets[: len(left.opener_offsets) - matched] + right.opener_offsets,
+        get_first_error(errors),
+    )
+
+
+def merge_all_summaries(summaries, spec=None):
+    """Merges the summaries of consecutive chunks into the summary of all of them, the same as
+    merging them two at a time from the first one. Instead of being copied at every merge, the
+    brackets left by each chunk are kept as parts, which are joined once at the end.
+
+    Args:
+        summaries (iterable of BracketSummary): summaries of the chunks, in order.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        BracketSummary: summary of all chunks.
+    """
+    spec = get_bracket_spec(spec)
+    closer_parts = []
+    # Stack of the openers left by each chunk, each with the number of its openers not closed yet.
+    opener_parts = []
+    errors = []
+    for summary in summaries:
+        errors.append(summary.error)
+        closers = summary.closers
+        position = 0
+        # The closers of the chunk close the openers of the previous chunks, from the top of the
+        # stack, one part at a time.
+        while position < len(closers) and opener_parts:
+            openers, opener_offsets, size = opener_parts[len(opener_parts) - 1]
+            matched = min(size, len(closers) - position)
+            expected = openers[size - matched : size][::-1].translate(spec.closing_table)
+            if expected != closers[position : position + matched]:
+                for index in range(matched):
+                    if expected[index] != closers[position + index]:
+                        errors.append(summary.closer_offsets[position + index])
+                        break
+            position += matched
+            if matched == size:
+                opener_parts.pop()
+            else:
+                opener_parts[len(opener_parts) - 1] = (openers, opener_offsets, size - matched)
+        # Closers are only left when no openers are left before them.
+        if position < len(closers):
+            closer_parts.append((closers[position:], summary.closer_offsets[position:]))
+        if summary.openers:
+            opener_parts.append((summary.openers, summary.opener_offsets, len(summary.openers)))
+
+    closer_offsets = array("q")
+    for _, offsets in closer_parts:
+        closer_offsets.extend(offsets)
+    opener_offsets = array("q")
+    for _, offsets, size in opener_parts:
+        opener_offsets.extend(offsets[:size])
+    return BracketSummary(
+        "".join(closers for closers, _ in closer_parts),
+        closer_offsets,
+        "".join(openers[:size] for openers, _, size in opener_parts),
+        opener_offsets,
+        get_first_error(errors),
+    )
+
+
+def get_summary_error(summary, length):
+    """Gives the offset of the first syntax error of a whole text from its summary.
+
+    Args:
+        summary (BracketSummary): summary of the whole text.
+        length (integer): length of the text.
+    Returns:
+        integer: offset of the first error, which is the length of the text if only opening brackets
+        are left unclosed, or None if the syntax is correct.
+    """
+    errors = [summary.error]
+    # A closing bracket without an opening counterpart at the start of the text is an error.
+    if summary.closers:
+        errors.append(summary.closer_offsets[0])
+    # Opening brackets without closing counterparts are only found at the end of the text.
+    if summary.openers:
+        errors.append(length)
+    return get_first_error(errors)
+
+
+def get_chunk_size(length, max_workers, chunk_size):
+    """Chooses the number of characters of each task from the size of the text."""
+    if chunk_size is None:
+        chunk_size = length // (max_workers * TASKS_PER_WORKER)
+        chunk_size = min(MAX_CHUNK_SIZE, max(MIN_CHUNK_SIZE, chunk_size))
+    return chunk_size
+
+
+def find_brackets_error_parallel(string, max_workers=None, chunk_size=None, spec=None):
+    """Finds the first bracket syntax error of a string, sharing the analysis of its chunks between
+    processes. The result is the same as the one of the sequential analysis.
+
+    Args:
+        string (string): text containing brackets and other characters.
+        max_workers (integer): number of processes, or None to use one per CPU.
+        chunk_size (integer): number of characters analyzed by each task, or None to choose it from
+        the size of the text.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        integer: offset of the first error, which is the length of the string if only opening
+        brackets are left unclosed, or None if the syntax is correct.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    chunk_size = get_chunk_size(len(string), max_workers, chunk_size)
+    starts = range(0, len(string), chunk_size)
+    # Small strings are analyzed in this process.
+    if len(starts) <= 1:
+        return get_summary_error(get_chunk_summary(string, 0, spec), len(string))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        summaries = executor.map(
+            get_chunk_summary,
+            (string[start : start + chunk_size] for start in starts),
+            starts,
+            repeat(spec),
+        )
+        # Summaries are given in the order of the chunks.
+        summary = merge_all_summaries(summaries, spec)
+    return get_summary_error(summary, len(string))
+
+
+def is_brackets_syntax_correct_parallel(string, max_workers=None, chunk_size=None, spec=None):
+    """Function that verifies if a string of brackets has a correct or incorrect syntax, sharing
+    the analysis between processes.
+
+    Args:
+        string (string): A string containing brackets and other characters.
+        max_workers (integer): number of processes, or None to use one per CPU.
+        chunk_size (integer): number of characters analyzed by each task, or None.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        boolean: True if the syntax is correct and False if it is incorrect.
+    """
+    return find_brackets_error_parallel(string, max_workers, chunk_size, spec) is None
+
+
+def get_file_chunk_summary(path, start, stop, spec=None):
+    """Task run by the workers: maps a file and analyzes a chunk of its bytes.
+
+    Bytes are read as Latin-1, which keeps offsets in bytes. Brackets are ASCII, and in UTF-8 ASCII
+    bytes are never part of other characters, so UTF-8 files are analyzed correctly.
+
+    Args:
+        path (string): path of the file.
+        start (integer): offset of the first byte of the chunk.
+        stop (integer): offset after the last byte of the chunk.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        BracketSummary: the summary of the chunk.
+    """
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        return get_chunk_summary(data[start:stop].decode("latin-1"), start, spec)
+
+
+def find_file_brackets_error_parallel(path, max_workers=None, chunk_size=None, spec=None):
+    """Finds the first bracket syntax error of a file, sharing the analysis of its chunks between
+    processes. Each worker reads its own chunk, so the file is never loaded as a whole.
+
+    Args:
+        path (string): path of the file, encoded in ASCII, Latin-1 or UTF-8.
+        max_workers (integer): number of processes, or None to use one per CPU.
+        chunk_size (integer): number of bytes analyzed by each task, or None to choose it from
+        the size of the file.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        integer: offset in bytes of the first error, which is the size of the file if only opening
+        brackets are left unclosed, or None if the syntax is correct.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return None
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    chunk_size = get_chunk_size(size, max_workers, chunk_size)
+    starts = range(0, size, chunk_size)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        summaries = executor.map(
+            get_file_chunk_summary,
+            [path] * len(starts),
+            starts,
+            [min(size, start + chunk_size) for start in starts],
+            repeat(spec),
+        )
+        summary = merge_all_summaries(summaries, spec)
+    return get_summary_error(summary, size)
+
+
+if __name__ == "__main__":
+    # Test scenario: a correct string, a string with a wrong closing bracket and an unclosed one.
+    for brackets in ["({}([ab])d{()}(c))" * 1000, "({[" * 1000 + "]})" * 999 + "])", "({" * 1000]:
+        print(find_brackets_error_parallel(brackets, max_workers=2, chunk_size=1000))
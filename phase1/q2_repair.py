@@ -0,0 +1,197 @@
+from q2_spec import get_bracket_spec
+
+syntax_input = "({a"
+
+
+def get_repair_tables(string, spec=None):
+    """Computes, for every substring, the minimum number of bracket insertions that make its syntax
+    correct and the number of distinct corrected strings with that minimum, by dynamic programming
+    over the substrings, in O(n^3) time and O(n^2) memory.
+
+    A corrected string can be built from the string by different insertions, such as "()" from "("
+    by inserting ")" after it or "(" before it. To count each corrected string once, insertions are
+    only counted where the characters of the string are matched as early as possible, which means an
+    inserted bracket is never the same as the character that follows it in the string.
+
+    A substring from i to j is corrected as a sequence of items: a character that is not a bracket,
+    or a pair of brackets with a correct syntax in between, where each bracket of the pair is either
+    from the string or inserted. Pairs with both brackets inserted are never part of a minimum.
+
+    Args:
+        string (string): A string containing brackets and other characters.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        costs (list of lists): costs[i][j] is the minimum number of insertions for string[i:j].
+        counts (list of lists): counts[i][j] is the number of distinct corrections with that minimum.
+    """
+    spec = get_bracket_spec(spec)
+    closing_brackets_dict = spec.closing_brackets_dict
+    opening_brackets_dict = spec.opening_brackets_dict
+    size = len(string)
+    infinity = float("inf")
+    costs = [[infinity] * (size + 1) for _ in range(size + 1)]
+    counts = [[0] * (size + 1) for _ in range(size + 1)]
+    for i in range(size + 1):
+        costs[i][i] = 0
+        counts[i][i] = 1
+    # Indexes of each closing bracket in the string.
+    closing_indexes = {closing: [] for closing in opening_brackets_dict}
+    for index, character in enumerate(string):
+        if character in opening_brackets_dict:
+            closing_indexes[character].append(index)
+
+    for length in range(1, size + 1):
+        for i in range(size - length + 1):
+            j = i + length
+            first = string[i]
+            best = infinity
+            ways = 0
+            # Each option is the cost and number of corrections of an item and of the rest.
+            options = []
+            if first in closing_brackets_dict:
+                closing = closing_brackets_dict[first]
+                costs_after = costs[i + 1]
+                counts_after = counts[i + 1]
+                # The opening bracket is closed by a closing bracket of the string.
+                for k in closing_indexes[closing]:
+                    if i < k < j:
+                        options.append(
+                            (
+                                costs_after[k] + costs[k + 1][j],
+                                counts_after[k] * counts[k + 1][j],
+                            )
+                        )
+                # The opening bracket is closed by an inserted bracket, right before index k.
+                for k in range(i + 1, j + 1):
+                    if k == size or string[k] != closing:
+                        options.append(
+                            (1 + costs_after[k] + costs[k][j], counts_after[k] * counts[k][j])
+                        )
+            elif first not in opening_brackets_dict:
+                # Characters that are not brackets are kept as they are.
+                options.append((costs[i + 1][j], counts[i + 1][j]))
+            # An opening bracket is inserted before the first character, and closed by a closing
+            # bracket of the string.
+            costs_before = costs[i]
+            counts_before = counts[i]
+            for opening, closing in closing_brackets_dict.items():
+                if opening == first:
+                    continue
+                for k in closing_indexes[closing]:
+                    if i <= k < j:
+                        options.append(
+                            (
+                                1 + costs_before[k] + costs[k + 1][j],
+                                counts_before[k] * counts[k + 1][j],
+                            )
+                        )
+            for cost, count in options:
+                if cost < best:
+                    best = cost
+                    ways = count
+                elif cost == best:
+                    ways += count
+            costs[i][j] = best
+            counts[i][j] = ways
+    return costs, counts
+
+
+def get_minimum_insertions(string, spec=None):
+    """Gives the minimum number of bracket insertions that make the syntax of a string correct.
+
+    Args:
+        string (string): A string containing brackets and other characters.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        integer: the minimum number of insertions.
+    """
+    costs, _ = get_repair_tables(string, spec)
+    return costs[0][len(string)]
+
+
+def count_optimal_repairs(string, spec=None):
+    """Gives the number of distinct strings with a correct syntax that can be made from a string
+    with the minimum number of bracket insertions.
+
+    Args:
+        string (string): A string containing brackets and other characters.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        integer: the number of distinct corrections with the minimum number of insertions.
+    """
+    _, counts = get_repair_tables(string, spec)
+    return counts[0][len(string)]
+
+
+def repair_brackets(string, spec=None):
+    """Makes the syntax of a string correct with the minimum number of bracket insertions.
+
+    Args:
+        string (string): A string containing brackets and other characters.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        string: one of the corrections with the minimum number of insertions.
+    """
+    costs, _ = get_repair_tables(string, spec)
+    size = len(string)
+    repaired = []
+    # Stack of substrings to be corrected and characters to be written, as the choices made for a
+    # substring are only known when it is reached.
+    tasks = [(0, size)]
+    while tasks:
+        task = tasks.pop()
+        if isinstance(task, str):
+            repaired.append(task)
+            continue
+        i, j = task
+        if i == j:
+            continue
+        tasks += find_repair_choice(string, costs, i, j, spec)
+    return "".join(repaired)
+
+
+def find_repair_choice(string, costs, i, j, spec=None):
+    """Finds the first item of a minimum correction of a substring, as in get_repair_tables.
+
+    Args:
+        string (string): A string containing brackets and other characters.
+        costs (list of lists): minimum number of insertions of every substring.
+        i (integer): start of the substring.
+        j (integer): end of the substring.
+        spec (BracketSpec): the alphabet of brackets, or None for round, curly and square brackets.
+    Returns:
+        list: tasks to be done, in reverse order, each a substring as a tuple of its start and
+        end, or a character to be written.
+    """
+    spec = get_bracket_spec(spec)
+    closing_brackets_dict = spec.closing_brackets_dict
+    opening_brackets_dict = spec.opening_brackets_dict
+    size = len(string)
+    first = string[i]
+    best = costs[i][j]
+    if first in closing_brackets_dict:
+        closing = closing_brackets_dict[first]
+        for k in range(i + 1, j):
+            if string[k] == closing and costs[i + 1][k] + costs[k + 1][j] == best:
+                return [(k + 1, j), closing, (i + 1, k), first]
+        for k in range(i + 1, j + 1):
+            if (k == size or string[k] != closing) and 1 + costs[i + 1][k] + costs[k][j] == best:
+                return [(k, j), closing, (i + 1, k), first]
+    elif first not in opening_brackets_dict:
+        if costs[i + 1][j] == best:
+            return [(i + 1, j), first]
+    for opening, closing in closing_brackets_dict.items():
+        if opening == first:
+            continue
+        for k in range(i, j):
+            if string[k] == closing and 1 + costs[i][k] + costs[k + 1][j] == best:
+                return [(k + 1, j), closing, (i, k), opening]
+    raise ValueError("The tables do not belong to the string.")
+
+
+if __name__ == "__main__":
+    # Verify a given case.
+    print("Original syntax: ", syntax_input)
+    print("Minimum insertions: ", get_minimum_insertions(syntax_input))
+    print("Optimal fixes: ", count_optimal_repairs(syntax_input))
+    print("One optimal fix: ", repair_brackets(syntax_input))
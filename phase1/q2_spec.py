@@ -0,0 +1,102 @@
+import re
+
+
+class BracketSpec:
+    """Alphabet of brackets used by the syntax checkers, with the tables they need built once.
+
+    Each pair is an opening and a closing bracket, both single characters. Besides the dictionaries
+    from each bracket to its counterpart, the alphabet has a regular expression that finds brackets
+    and one that finds every other character, so that text that is mostly not brackets can have
+    those characters dropped in bulk. For bytes, if all brackets fit in a byte, every other byte is
+    dropped with bytes.translate.
+    """
+
+    def __init__(self, *pairs):
+        """Builds the tables of an alphabet of brackets.
+
+        Args:
+            pairs (strings): each an opening bracket followed by its closing bracket, such as "()"
+            or "<>".
+        """
+        if not pairs:
+            raise ValueError("There must be at least one pair of brackets.")
+        self.pairs = tuple(pairs)
+        self.closing_brackets_dict = {}
+        self.opening_brackets_dict = {}
+        for pair in self.pairs:
+            if len(pair) != 2 or pair[0] == pair[1]:
+                raise ValueError(f"{pair!r} is not a pair of two different characters.")
+            opening, closing = pair
+            if opening in self.closing_brackets_dict or opening in self.opening_brackets_dict:
+                raise ValueError(f"{opening!r} is in more than one pair.")
+            if closing in self.closing_brackets_dict or closing in self.opening_brackets_dict:
+                raise ValueError(f"{closing!r} is in more than one pair.")
+            self.closing_brackets_dict[opening] = closing
+            self.opening_brackets_dict[closing] = opening
+        self.opening_brackets = frozenset(self.closing_brackets_dict)
+        self.closing_brackets = frozenset(self.opening_brackets_dict)
+
+        brackets = re.escape("".join(pair for pair in self.pairs))
+        self.bracket_pattern = re.compile(f"[{brackets}]")
+        self.other_pattern = re.compile(f"[^{brackets}]+")
+        # Table that converts opening brackets to their closing counterparts.
+        self.closing_table = str.maketrans(self.closing_brackets_dict)
+
+        # Bytes that are not brackets, to be deleted by bytes.translate. Only defined if all brackets
+        # fit in a byte.
+        self.byte_deletions = None
+        byte_brackets = {ord(character) for pair in self.pairs for character in pair}
+        if max(byte_brackets) < 256:
+            self.byte_deletions = bytes(
+                value for value in range(256) if value not in byte_brackets
+            )
+
+    @classmethod
+    def from_dict(cls, closing_brackets_dict):
+        """Builds an alphabet from a dictionary with the closing counterpart of each opening bracket."""
+        return cls(*(opening + closing for opening, closing in closing_brackets_dict.items()))
+
+    def strip(self, text):
+        """Drops every character that is not a bracket.
+
+        Args:
+            text (string or bytes): text containing brackets and other characters.
+        Returns:
+            string or bytes: the brackets of the text, in order.
+        """
+        if isinstance(text, (bytes, bytearray)):
+            if self.byte_deletions is None:
+                raise ValueError("Brackets do not fit in a byte.")
+            return text.translate(None, self.byte_deletions)
+        return self.other_pattern.sub("", text)
+
+    def __eq__(self, other):
+        if not isinstance(other, BracketSpec):
+            return NotImplemented
+        return self.pairs == other.pairs
+
+    def __hash__(self):
+        return hash(self.pairs)
+
+    def __repr__(self):
+        return f"BracketSpec({', '.join(repr(pair) for pair in self.pairs)})"
+
+    def __reduce__(self):
+        # Only the pairs are sent to other processes, which build the tables again.
+        return (BracketSpec, self.pairs)
+
+
+# Round, curly and square brackets, as used by the syntax checkers by default.
+DEFAULT_BRACKET_SPEC = BracketSpec("()", "{}", "[]")
+
+
+def get_bracket_spec(spec=None):
+    """Gives the alphabet of brackets to be used, the default one if None is given."""
+    return DEFAULT_BRACKET_SPEC if spec is None else spec
+
+
+if __name__ == "__main__":
+    # Test scenario: angle brackets in text that is mostly not brackets.
+    spec = BracketSpec("<>", "()")
+    print(spec, repr(spec.strip("Map<String, List<Integer>> f(x);")))
+    print(repr(spec.strip(b"Map<String, List<Integer>> f(x);")))
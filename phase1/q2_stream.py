@@ -0,0 +1,164 @@
+import re
+
+from q2_spec import DEFAULT_BRACKET_SPEC, BracketSpec
+
+# Number of bytes or characters read at a time from files.
+CHUNK_SIZE = 1 << 16
+
+
+class StreamingBracketValidator:
+    """Verifies the bracket syntax of a text that arrives in chunks, such as from a socket, a pipe
+    or a file, without keeping the text in memory.
+
+    With a single type of bracket, only the number of unclosed brackets is kept. With several types,
+    the stack of unclosed brackets is kept as a bytearray with the index of each bracket type, one
+    byte per bracket.
+
+    Chunks must all be strings, with offsets in characters, or all be bytes, with offsets in bytes.
+    Brackets of bytes are encoded as Latin-1, so ASCII brackets are found in UTF-8 text, where ASCII
+    bytes are never part of other characters.
+    """
+
+    def __init__(self, brackets=None):
+        """Creates a validator for an empty text.
+
+        Args:
+            brackets (dictionary or BracketSpec): closing counterpart of each opening bracket, or
+            None for round, curly and square brackets.
+        """
+        if brackets is None:
+            brackets = DEFAULT_BRACKET_SPEC.closing_brackets_dict
+        elif isinstance(brackets, BracketSpec):
+            brackets = brackets.closing_brackets_dict
+        if not 0 < len(brackets) <= 256:
+            raise ValueError("There must be between 1 and 256 types of brackets.")
+        self.brackets = dict(brackets)
+        # Number of characters or bytes fed so far.
+        self.offset = 0
+        # Offset of the first syntax error, or None while none was found.
+        self.error = None
+        self.depth = 0
+        self.stack = bytearray()
+        self._chunk_type = None
+
+    def _prepare(self, chunk_type):
+        """Prepares the brackets for the type of the chunks, which is set by the first chunk."""
+        self._chunk_type = chunk_type
+        brackets = list(self.brackets.items())
+        if chunk_type is bytes:
+            brackets = [
+                (opening.encode("latin-1"), closing.encode("latin-1"))
+                for opening, closing in brackets
+            ]
+        # Type index of each bracket, and whether it is an opening bracket.
+        self._bracket_types = {}
+        for index, (opening, closing) in enumerate(brackets):
+            self._bracket_types[opening] = (index, True)
+            self._bracket_types[closing] = (index, False)
+        self._opening, self._closing = brackets[0] if len(brackets) == 1 else (None, None)
+        separator = "|" if chunk_type is str else b"|"
+        self._pattern = re.compile(
+            separator.join(re.escape(bracket) for bracket in self._bracket_types)
+        )
+
+    def feed(self, chunk):
+        """Analyzes the next chunk of the text.
+
+        Args:
+            chunk (string or bytes): the next characters or bytes of the text.
+        Returns:
+            boolean: False if an error was found so far, so that the rest of the text can be skipped.
+        """
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            chunk_type = bytes
+            chunk = bytes(chunk)
+        elif isinstance(chunk, str):
+            chunk_type = str
+        else:
+            raise TypeError("Chunks must be strings or bytes.")
+        if self._chunk_type is None:
+            self._prepare(chunk_type)
+        elif chunk_type is not self._chunk_type:
+            raise TypeError("Chunks must all be strings or all be bytes.")
+
+        if self.error is None:
+            if self._opening is not None:
+                self._feed_counter(chunk)
+            else:
+                self._feed_stack(chunk)
+        self.offset += len(chunk)
+        return self.error is None
+
+    def _feed_counter(self, chunk):
+        """Analyzes a chunk with a single type of bracket, counting the unclosed brackets."""
+        closing_count = chunk.count(self._closing)
+        # If there are not more closing brackets than unclosed ones, none of them can be an error.
+        if closing_count <= self.depth:
+            self.depth += chunk.count(self._opening) - closing_count
+            return
+        opening = self._opening
+        for match in self._pattern.finditer(chunk):
+            if match.group() == opening:
+                self.depth += 1
+            elif self.depth:
+                self.depth -= 1
+            # A closing bracket without its opening counterpart is an error.
+            else:
+                self.error = self.offset + match.start()
+                return
+
+    def _feed_stack(self, chunk):
+        """Analyzes a chunk with several types of brackets, stacking the unclosed brackets."""
+        stack = self.stack
+        bracket_types = self._bracket_types
+        for match in self._pattern.finditer(chunk):
+            index, is_opening = bracket_types[match.group()]
+            # If an opening bracket is met, then it is stacked.
+            if is_opening:
+                stack.append(index)
+            # A closing bracket must close the bracket on the top of the stack.
+            elif stack and stack[len(stack) - 1] == index:
+                stack.pop()
+            else:
+                self.error = self.offset + match.start()
+                return
+
+    def finish(self):
+        """Ends the text, which is an error if brackets are left unclosed.
+
+        Returns:
+            integer: offset of the first error, which is the length of the text if only opening
+            brackets are left unclosed, or None if the syntax is correct.
+        """
+        if self.error is None and (self.depth or self.stack):
+            self.error = self.offset
+        return self.error
+
+
+def find_file_brackets_error(file, brackets=None, chunk_size=CHUNK_SIZE):
+    """Finds the first bracket syntax error of a file, reading it one chunk at a time and stopping
+    at the first error.
+
+    Args:
+        file (file object): file opened in text or binary mode.
+        brackets (dictionary or BracketSpec): closing counterpart of each opening bracket, or None
+        for round, curly and square brackets.
+        chunk_size (integer): number of characters or bytes read at a time.
+    Returns:
+        integer: offset of the first error, or None if the syntax is correct.
+    """
+    validator = StreamingBracketValidator(brackets)
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk or not validator.feed(chunk):
+            break
+    return validator.finish()
+
+
+if __name__ == "__main__":
+    # Test scenario: a correct text that arrives in three chunks, and an unclosed one.
+    for chunks in [["({}([ab]", ")d{()}", "(c))"], [b"(()", b"())(", b"("]]:
+        validator = StreamingBracketValidator()
+        for chunk in chunks:
+            validator.feed(chunk)
+        print(validator.finish())
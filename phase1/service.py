@@ -0,0 +1,576 @@
+"""Asyncio service that validates and repairs bracket syntaxes and polygons.
+
+Requests and responses are JSON objects, one per line, over a Unix socket or a local TCP port:
+    {"id": 1, "op": "validate_brackets", "params": {"text": "({a)", "pairs": ["()", "{}"]}}
+    {"id": 1, "result": {"valid": false, "error_offset": 3}}
+Responses may come in a different order than the requests, and are matched by their id. Errors
+are given as {"id": 1, "error": {"type": "invalid_request", "message": "..."}}.
+
+Operations:
+    - validate_brackets: text, pairs (optional). Gives whether the syntax is valid and the offset of
+      the first error, as in q2_parallel.
+    - repair_brackets: text, pairs (optional), mode ("minimal" or "all"), max_results (optional).
+      Minimal gives one repair with the minimum number of insertions, as in q2_repair. All gives the
+      fixes of q2_b4, stopped after max_results fixes or a time budget.
+    - validate_polygon: points. Gives whether the polygon follows the format.
+    - clean_polygon: points, tolerance (optional). Gives the points without redundant points.
+
+Requests that arrive together are grouped by operation and sent as a single task to a pool of
+worker processes, which uses the batch and vectorized solutions when they apply. Repairs, which
+can take about a second each, are sent one at a time instead. When the workers are busy, requests
+wait in a bounded queue, and once it is full no more requests are read, so clients are slowed down
+instead of the service running out of memory.
+
+Usage:
+    python service.py --unix /tmp/checkers.sock
+    python service.py --host 127.0.0.1 --port 8765
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import q1_batch
+from q1 import InvalidPolygonError, clean_polygon_checked, is_polygon_valid
+from q1 import remove_repeated_chains_hashed
+from q2_b4 import iter_fixed_syntaxes
+from q2_numpy import find_brackets_errors_batch, pack_strings
+from q2_parallel import get_chunk_summary, get_summary_error
+from q2_repair import repair_brackets
+from q2_spec import BracketSpec, get_bracket_spec
+
+# Maximum size of a request line, in bytes.
+MAX_REQUEST_BYTES = 1 << 22
+# Maximum length of a text to be validated.
+MAX_TEXT_LENGTH = 1 << 22
+# Maximum length of a text to be repaired with the minimum number of insertions, which takes
+# cubic time, about a second for the longest texts.
+MAX_REPAIR_LENGTH = 300
+# Maximum length of a text to have all its fixes searched, and limits of each search, so that a
+# single text with many errors cannot keep a worker busy.
+MAX_FIXES_TEXT_LENGTH = 10_000
+MAX_FIXES = 1_000
+FIXES_TIME_BUDGET = 1.0
+# Maximum number of points of a polygon.
+MAX_POLYGON_POINTS = 1_000_000
+# Integer coordinates below this size are cleaned by the vectorized solution. Differences of such
+# coordinates are below 2^31, so each dot or cross product, a sum of two products of differences,
+# is below 2^63 and fits in 64 bit integers. At 2^30, a difference of 2^31 gives a product of 2^63,
+# which wraps around.
+MAX_BATCH_COORDINATE = 1 << 30
+
+# Requests of the same operation are grouped in batches of up to this size, waiting up to this
+# number of seconds for other requests to arrive.
+MAX_BATCH_SIZE = 256
+MAX_BATCH_DELAY = 0.002
+# Maximum number of requests waiting for a worker, after which no more requests are read.
+MAX_PENDING_REQUESTS = 4096
+# Maximum number of requests of a single connection that can wait for their responses.
+MAX_CONNECTION_REQUESTS = 256
+# Operations whose requests can each keep a worker busy for up to about a second, which are sent
+# to the workers one request at a time, so that a batch of them does not stall a worker.
+UNBATCHED_OPERATIONS = frozenset(["repair_brackets"])
+
+
+class RequestError(ValueError):
+    """Error of a request that cannot be handled, reported back to the client."""
+
+    def __init__(self, message, error_type="invalid_request"):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+def get_error_response(error):
+    """Gives the response of a request that failed with an error."""
+    if isinstance(error, RequestError):
+        error_type = error.error_type
+    elif isinstance(error, InvalidPolygonError):
+        error_type = "invalid_polygon"
+    else:
+        error_type = "internal_error"
+        error = f"{type(error).__name__}: {error}"
+    return {"error": {"type": error_type, "message": str(error)}}
+
+
+def parse_bracket_params(params, max_length):
+    """Checks the parameters of a bracket operation.
+
+    Args:
+        params (dictionary): parameters of the request.
+        max_length (integer): maximum length of the text.
+    Returns:
+        dictionary: the parameters, with the alphabet of brackets as a BracketSpec.
+    """
+    text = params.get("text")
+    if not isinstance(text, str):
+        raise RequestError("text must be a string.")
+    if len(text) > max_length:
+        raise RequestError(f"text is longer than {max_length} characters.", "too_large")
+    pairs = params.get("pairs")
+    try:
+        spec = None if pairs is None else BracketSpec(*pairs)
+    except (TypeError, ValueError) as error:
+        raise RequestError(f"Invalid pairs: {error}")
+    return dict(params, spec=spec)
+
+
+def parse_polygon_params(params):
+    """Checks the parameters of a polygon operation.
+
+    Args:
+        params (dictionary): parameters of the request.
+    Returns:
+        dictionary: the parameters, with the points as a list of tuples.
+    """
+    points = params.get("points")
+    if not isinstance(points, list):
+        raise RequestError("points must be a list of 2D coordinates.")
+    if len(points) > MAX_POLYGON_POINTS:
+        raise RequestError(f"Polygon has more than {MAX_POLYGON_POINTS} points.", "too_large")
+    for point in points:
+        if (
+            not isinstance(point, list)
+            or len(point) != 2
+            or not all(type(value) in (int, float) for value in point)
+        ):
+            raise RequestError("points must be a list of 2D coordinates.")
+    tolerance = params.get("tolerance")
+    if tolerance is not None and (type(tolerance) not in (int, float) or tolerance < 0):
+        raise RequestError("tolerance must be a non negative number.")
+    return dict(params, points=[tuple(point) for point in points])
+
+
+def load_request(line):
+    """Reads a request line.
+
+    Args:
+        line (bytes): the JSON request.
+    Returns:
+        dictionary: the request.
+    """
+    try:
+        request = json.loads(line)
+    except (UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise RequestError(f"Request is not valid JSON: {error}")
+    if not isinstance(request, dict):
+        raise RequestError("Request must be a JSON object.")
+    return request
+
+
+def parse_request(request):
+    """Checks the operation of a request and its parameters.
+
+    Args:
+        request (dictionary): the request.
+    Returns:
+        operation (string): name of the operation.
+        params (dictionary): checked parameters of the operation.
+    """
+    operation = request.get("op")
+    params = request.get("params", {})
+    if not isinstance(params, dict):
+        raise RequestError("params must be a JSON object.")
+    if operation == "validate_brackets":
+        params = parse_bracket_params(params, MAX_TEXT_LENGTH)
+    elif operation == "repair_brackets":
+        mode = params.get("mode", "minimal")
+        if mode not in ("minimal", "all"):
+            raise RequestError('mode must be "minimal" or "all".')
+        max_length = MAX_REPAIR_LENGTH if mode == "minimal" else MAX_FIXES_TEXT_LENGTH
+        params = parse_bracket_params(params, max_length)
+        max_results = params.get("max_results", MAX_FIXES)
+        if type(max_results) is not int or not 0 < max_results <= MAX_FIXES:
+            raise RequestError(f"max_results must be an integer from 1 to {MAX_FIXES}.")
+        params["mode"] = mode
+        params["max_results"] = max_results
+    elif operation in ("validate_polygon", "clean_polygon"):
+        params = parse_polygon_params(params)
+    else:
+        raise RequestError(f"Unknown operation {operation!r}.")
+    return operation, params
+
+
+def validate_brackets_batch(params_list):
+    """Validates the bracket syntax of a batch of texts. Texts in ASCII with a single pair of
+    brackets are validated together by the vectorized solution.
+
+    Args:
+        params_list (list of dictionaries): parameters of each request.
+    Returns:
+        list of dictionaries: result of each request.
+    """
+    errors = [None] * len(params_list)
+    # Texts of the vectorized solution, by their pair of brackets.
+    single_pair_texts = {}
+    for index, params in enumerate(params_list):
+        spec = get_bracket_spec(params["spec"])
+        text = params["text"]
+        if len(spec.pairs) == 1 and spec.pairs[0].isascii() and text.isascii():
+            single_pair_texts.setdefault(spec.pairs[0], []).append(index)
+        else:
+            summary = get_chunk_summary(text, 0, spec)
+            errors[index] = get_summary_error(summary, len(text))
+    for (opening, closing), indexes in single_pair_texts.items():
+        buffer, offsets = pack_strings([params_list[index]["text"] for index in indexes])
+        batch_errors = find_brackets_errors_batch(buffer, offsets, opening, closing)
+        for index, error in zip(indexes, batch_errors.tolist()):
+            errors[index] = None if error < 0 else error
+    return [
+        {"result": {"valid": error is None, "error_offset": error}} for error in errors
+    ]
+
+
+def repair_brackets_batch(params_list):
+    """Repairs the bracket syntax of a batch of texts.
+
+    Args:
+        params_list (list of dictionaries): parameters of each request.
+    Returns:
+        list of dictionaries: result of each request.
+    """
+    results = []
+    for params in params_list:
+        try:
+            results.append({"result": repair_brackets_request(params)})
+        except Exception as error:
+            results.append(get_error_response(error))
+    return results
+
+
+def repair_brackets_request(params):
+    """Repairs the bracket syntax of a text.
+
+    Args:
+        params (dictionary): parameters of the request.
+    Returns:
+        dictionary: result of the request.
+    """
+    text = params["text"]
+    spec = params["spec"]
+    if params["mode"] == "minimal":
+        repair = repair_brackets(text, spec)
+        return {"insertions": len(repair) - len(text), "repair": repair}
+    start = time.monotonic()
+    fixes = list(iter_fixed_syntaxes(text, params["max_results"], FIXES_TIME_BUDGET, spec))
+    # The search may have stopped before every fix was found.
+    truncated = (
+        len(fixes) >= params["max_results"] or time.monotonic() - start >= FIXES_TIME_BUDGET
+    )
+    return {"fixes": fixes, "truncated": truncated}
+
+
+def validate_polygon_batch(params_list):
+    """Validates the format of a batch of polygons.
+
+    Args:
+        params_list (list of dictionaries): parameters of each request.
+    Returns:
+        list of dictionaries: result of each request.
+    """
+    return [
+        {"result": {"valid": len(params["points"]) > 0 and is_polygon_valid(params["points"])}}
+        for params in params_list
+    ]
+
+
+def is_batch_polygon(params):
+    """Evaluates if a polygon can be cleaned by the vectorized solution, which is exact for
+    integer coordinates that are not too large, without tolerance."""
+    return params.get("tolerance") is None and all(
+        type(value) is int and -MAX_BATCH_COORDINATE < value < MAX_BATCH_COORDINATE
+        for point in params["points"]
+        for value in point
+    )
+
+
+def clean_polygon_request(params):
+    """Removes redundant points from a polygon with the list based solution.
+
+    Args:
+        params (dictionary): parameters of the request.
+    Returns:
+        dictionary: response of the request.
+    """
+    try:
+        clean_points = clean_polygon_checked(params["points"], params.get("tolerance"))
+    except Exception as error:
+        return get_error_response(error)
+    return {"result": {"points": [list(point) for point in clean_points]}}
+
+
+def clean_polygon_batch(params_list):
+    """Removes redundant points from a batch of polygons. Polygons with integer coordinates have
+    their repeated and in between points removed together by the vectorized solution, and then
+    their repeated chains removed one at a time.
+
+    Args:
+        params_list (list of dictionaries): parameters of each request.
+    Returns:
+        list of dictionaries: result of each request.
+    """
+    results = [None] * len(params_list)
+    batch_indexes = []
+    for index, params in enumerate(params_list):
+        if is_batch_polygon(params):
+            batch_indexes.append(index)
+            continue
+        results[index] = clean_polygon_request(params)
+
+    if batch_indexes:
+        polygons = [params_list[index]["points"] for index in batch_indexes]
+        coordinates = np.array(
+            [value for points in polygons for point in points for value in point],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        offsets = np.zeros(len(polygons) + 1, dtype=np.int64)
+        np.cumsum([len(points) for points in polygons], out=offsets[1:])
+        valid = q1_batch.are_polygons_valid(coordinates, offsets)
+        clean_coordinates, clean_offsets = q1_batch.clean_polygons(coordinates, offsets)
+        for i, index in enumerate(batch_indexes):
+            if not valid[i]:
+                error = InvalidPolygonError("Input Polygon is invalid.")
+                results[index] = get_error_response(error)
+                continue
+            points = clean_coordinates[clean_offsets[i] : clean_offsets[i + 1]].tolist()
+            # The vectorized solution keeps polygons with less than three points as they are, so
+            # these are cleaned by the list based solution to give the same response.
+            if len(points) < 3:
+                results[index] = clean_polygon_request(params_list[index])
+                continue
+            clean_points = remove_repeated_chains_hashed([tuple(point) for point in points])
+            if len(clean_points) == 0 or not is_polygon_valid(clean_points):
+                error = InvalidPolygonError("Output Polygon is invalid.")
+                results[index] = get_error_response(error)
+            else:
+                results[index] = {"result": {"points": [list(point) for point in clean_points]}}
+    return results
+
+
+# Function that handles a batch of each operation.
+OPERATIONS = {
+    "validate_brackets": validate_brackets_batch,
+    "repair_brackets": repair_brackets_batch,
+    "validate_polygon": validate_polygon_batch,
+    "clean_polygon": clean_polygon_batch,
+}
+
+
+def run_operation_batch(operation, params_list):
+    """Task run by the workers: handles a batch of requests of the same operation.
+
+    Args:
+        operation (string): name of the operation.
+        params_list (list of dictionaries): checked parameters of each request.
+    Returns:
+        list of dictionaries: result or error of each request, in the same order.
+    """
+    return OPERATIONS[operation](params_list)
+
+
+class CheckerService:
+    """Server of the validation and repair operations, with the queue of requests that are grouped
+    in batches and the pool of worker processes that handles them."""
+
+    def __init__(self, max_workers=None):
+        """Creates the service, without listening yet.
+
+        Args:
+            max_workers (integer): number of worker processes, or None to use one per CPU.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = None
+        self.server = None
+        self.path = None
+        self.queue = None
+        self.batcher = None
+        # Limits the batches sent to the workers, so that requests wait in the queue instead.
+        self.batch_slots = None
+        self.batch_tasks = set()
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        """Starts the workers and listens on a Unix socket if a path is given, or on a TCP port.
+
+        Args:
+            host (string): address of the TCP server.
+            port (integer): port of the TCP server.
+            path (string): path of the Unix socket, or None.
+        """
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        # Workers are started before listening, as workers started later would inherit the sockets
+        # of the open connections, keeping them open after the service closes them.
+        await asyncio.get_running_loop().run_in_executor(
+            self.executor, run_operation_batch, "validate_polygon", []
+        )
+        self.queue = asyncio.Queue(maxsize=MAX_PENDING_REQUESTS)
+        self.batch_slots = asyncio.Semaphore(2 * self.max_workers)
+        self.batcher = asyncio.create_task(self.run_batches())
+        if path is not None:
+            self.path = path
+            self.server = await asyncio.start_unix_server(
+                self.handle_connection, path, limit=MAX_REQUEST_BYTES
+            )
+        else:
+            self.server = await asyncio.start_server(
+                self.handle_connection, host, port, limit=MAX_REQUEST_BYTES
+            )
+
+    async def close(self):
+        """Stops listening, removes the Unix socket, cancels the batches and stops the workers."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+        if self.batcher is not None:
+            self.batcher.cancel()
+        if self.executor is not None:
+            # Waiting for the running batches blocks, so it is done in a thread to keep the event
+            # loop running.
+            await asyncio.to_thread(self.executor.shutdown, cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        """Reads the requests of a connection, handling each as soon as it is read."""
+        connection_slots = asyncio.Semaphore(MAX_CONNECTION_REQUESTS)
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The rest of a request that is too long cannot be told apart from the next
+                    # request, so the connection is closed.
+                    error = RequestError("Request is too large.", "too_large")
+                    await self.send_response(writer, None, get_error_response(error))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await connection_slots.acquire()
+                task = asyncio.create_task(self.handle_request(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _: connection_slots.release())
+            if tasks:
+                await asyncio.wait(tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def handle_request(self, line, writer):
+        """Handles a request and sends its response."""
+        request_id = None
+        try:
+            request = load_request(line)
+            request_id = request.get("id")
+            operation, params = parse_request(request)
+            future = asyncio.get_running_loop().create_future()
+            # Waits while the queue is full, which stops reading requests from the connection.
+            await self.queue.put((operation, params, future))
+            response = await future
+        except Exception as error:
+            response = get_error_response(error)
+        await self.send_response(writer, request_id, response)
+
+    async def send_response(self, writer, request_id, response):
+        """Writes a response line, waiting if the client is not reading them."""
+        writer.write(json.dumps(dict(response, id=request_id)).encode() + b"\n")
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def run_batches(self):
+        """Groups the queued requests in batches of the same operation and sends them to the
+        workers."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + MAX_BATCH_DELAY
+            while len(batch) < MAX_BATCH_SIZE:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            operations = {}
+            for operation, params, future in batch:
+                operations.setdefault(operation, []).append((params, future))
+            # Batches of other operations are sent first, so they do not wait for the repairs.
+            for operation, requests in sorted(
+                operations.items(), key=lambda item: item[0] in UNBATCHED_OPERATIONS
+            ):
+                if operation in UNBATCHED_OPERATIONS:
+                    batches = [[request] for request in requests]
+                else:
+                    batches = [requests]
+                for batch_requests in batches:
+                    await self.batch_slots.acquire()
+                    task = asyncio.create_task(self.run_batch(operation, batch_requests))
+                    self.batch_tasks.add(task)
+                    task.add_done_callback(self.batch_tasks.discard)
+
+    async def run_batch(self, operation, requests):
+        """Runs a batch of requests of the same operation in a worker, and gives each request its
+        response."""
+        loop = asyncio.get_running_loop()
+        try:
+            responses = await loop.run_in_executor(
+                self.executor,
+                run_operation_batch,
+                operation,
+                [params for params, _ in requests],
+            )
+        except Exception as error:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for (_, future), response in zip(requests, responses):
+                if not future.done():
+                    future.set_result(response)
+        finally:
+            self.batch_slots.release()
+
+
+async def serve(host="127.0.0.1", port=8765, path=None, max_workers=None):
+    """Runs the service until it is cancelled."""
+    service = CheckerService(max_workers)
+    await service.start(host, port, path)
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(arguments=None):
+    """Command line interface of the service."""
+    parser = argparse.ArgumentParser(description="Bracket and polygon checking service.")
+    parser.add_argument("--unix", help="path of the Unix socket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    arguments = parser.parse_args(arguments)
+    try:
+        asyncio.run(serve(arguments.host, arguments.port, arguments.unix, arguments.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()